@@ -11,19 +11,22 @@ This module orchestrates the entire workflow:
 
 import os
 import sys
-from typing import List, Dict
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Dict, Optional
+
+import numpy as np
 
 # Ensure project root is in path for imports
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from src.database.database import Database, TrainingDataDB, IdealFunctionDB, TestDataDB
+from src.database.database import Database
 from src.core.data_loader import TrainingDataLoader, IdealFunctionLoader, TestDataLoader
 from src.core.ideal_function_selector import IdealFunctionSelector
 from src.core.test_mapper import TestDataMapper
-from src.core.visualization import Visualizer
-from src.models.models import TrainingData, IdealFunction, TestData
+from src.models.models import TrainingDataset, IdealFunction
+from src.utils.config import create_directories
 from src.utils.exceptions import (
     DataLoadError,
     InvalidDataError,
@@ -31,7 +34,20 @@ from src.utils.exceptions import (
     MappingError,
     VisualizationError,
 )
-from sqlalchemy.orm import Session
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+if TYPE_CHECKING:
+    from src.core.visualization import Visualizer
+
+# Column names of the training_data table, in CSV order
+TRAINING_KEYS = ("x", "y1", "y2", "y3", "y4")
+
+# Column names of the y1..y50 ideal function columns, built once
+IDEAL_Y_KEYS = tuple(f"y{k}" for k in range(1, 51))
+
+# Number of mapped test rows buffered before each bulk insert
+TEST_INSERT_BATCH_SIZE = 10_000
 
 
 class Application:
@@ -49,18 +65,31 @@ class Application:
         Args:
             db_path: Path to the SQLite database.
         """
-        self.db = Database(db_path)
+        self.db = Database(db_path, raw_inserts=True)
         self.training_loader = TrainingDataLoader()
-        self.ideal_loader = IdealFunctionLoader()
+        self.ideal_loader = IdealFunctionLoader(use_cache=True)
         self.test_loader = TestDataLoader()
         self.selector = IdealFunctionSelector()
-        self.visualizer = Visualizer()
         
-        self.training_data_sets: Dict[str, List[TrainingData]] = {}
+        self.training_data_sets: Dict[str, TrainingDataset] = {}
         self.ideal_functions: List[IdealFunction] = []
-        self.test_data: List[TestData] = []
+        self.ideal_x_values: Optional[np.ndarray] = None
+        self.ideal_mat: Optional[np.ndarray] = None
+        self.test_file: Optional[str] = None
         self.selected_ideal_functions: Dict = {}
 
+    @cached_property
+    def visualizer(self) -> "Visualizer":
+        """
+        Visualizer created on first use.
+
+        Importing the visualization module pulls in Bokeh, so it is deferred
+        until plots are actually generated.
+        """
+        from src.core.visualization import Visualizer
+
+        return Visualizer()
+
     def load_data(
         self,
         training_files: List[str],
@@ -83,7 +112,7 @@ class Application:
             print("Loading training data...")
             for i, file_path in enumerate(training_files):
                 if os.path.exists(file_path):
-                    training_data, _ = self.training_loader.load_training_data(file_path)
+                    training_data = self.training_loader.load_training_dataset(file_path)
                     self.training_data_sets[f"train{i+1}"] = training_data
                     print(f"  [OK] Loaded training data {i+1}: {len(training_data)} points")
                 else:
@@ -91,15 +120,23 @@ class Application:
 
             print("Loading ideal functions...")
             if os.path.exists(ideal_file):
-                self.ideal_functions, _ = self.ideal_loader.load_ideal_functions(ideal_file)
+                ideal_dataset = self.ideal_loader.load_ideal_dataset(ideal_file)
+                self.ideal_x_values = ideal_dataset.x
+                # One (50, N) matrix shared by selection, mapping and plotting;
+                # each IdealFunction's y_values is a view onto its row
+                self.ideal_mat = np.ascontiguousarray(ideal_dataset.Y.T)
+                self.ideal_functions = ideal_dataset.functions
                 print(f"  [OK] Loaded ideal functions: {len(self.ideal_functions)} functions with 50 each")
             else:
                 print(f"  [ERROR] Ideal functions file not found: {ideal_file}")
 
             print("Loading test data...")
             if os.path.exists(test_file):
-                self.test_data, _ = self.test_loader.load_test_data(test_file)
-                print(f"  [OK] Loaded test data: {len(self.test_data)} points")
+                # Test data is streamed in chunks during mapping; check its
+                # header now so a bad file fails before the DB is touched
+                self.test_loader.validate_test_file(test_file)
+                self.test_file = test_file
+                print(f"  [OK] Found test data: {test_file}")
             else:
                 print(f"  [ERROR] Test data file not found: {test_file}")
 
@@ -116,89 +153,75 @@ class Application:
         try:
             print("Initializing database...")
             self.db.init_db()
+            # Start each run from empty tables
+            self.db.reset()
             print("  [OK] Database initialized")
 
-            self._populate_training_data()
-            self._populate_ideal_functions()
+            # One transaction (and one commit) for the whole population step
+            with self.db.engine.begin() as conn:
+                self._populate_training_data(conn)
+                self._populate_ideal_functions(conn)
 
-        except DatabaseError as e:
+        except (DatabaseError, SQLAlchemyError) as e:
             raise DatabaseError(f"Error initializing database: {str(e)}") from e
 
-    def _populate_training_data(self) -> None:
-        """Populate training data into the database."""
-        session: Session = None
-        try:
-            session = self.db.get_session()
+    def _populate_training_data(self, conn: Connection) -> None:
+        """
+        Populate training data into the database.
 
+        Args:
+            conn: Connection with an open transaction, committed by the caller.
+        """
+        try:
             # Use the first training dataset (Y1, Y2, Y3, Y4 from the same file)
             if self.training_data_sets:
                 training_data = list(self.training_data_sets.values())[0]
-                
-                for data_point in training_data:
-                    db_record = TrainingDataDB(
-                        x=data_point.x,
-                        y1=data_point.y_values[0],
-                        y2=data_point.y_values[1],
-                        y3=data_point.y_values[2],
-                        y4=data_point.y_values[3],
-                    )
-                    session.add(db_record)
-
-                session.commit()
+
+                # One (N, 5) matrix converted to Python floats in a single call
+                mat = np.column_stack((training_data.x, training_data.Y))
+                rows = [dict(zip(TRAINING_KEYS, row)) for row in mat.tolist()]
+                self.db.bulk_insert_training(rows, conn)
                 print(f"  [OK] Populated training data: {len(training_data)} records")
 
         except Exception as e:
-            if session:
-                session.rollback()
             raise DatabaseError(f"Error populating training data: {str(e)}") from e
-        finally:
-            if session:
-                session.close()
 
-    def _populate_ideal_functions(self) -> None:
-        """Populate ideal functions into the database."""
-        session: Session = None
-        try:
-            session = self.db.get_session()
+    def _populate_ideal_functions(self, conn: Connection) -> None:
+        """
+        Populate ideal functions into the database.
 
+        Args:
+            conn: Connection with an open transaction, committed by the caller.
+        """
+        try:
             # ideal_functions are loaded as 50 objects, each with 400 Y values
             # We need to transpose back to store as rows with X and 50 Y values
             if not self.ideal_functions:
                 return
-                
+
             num_points = len(self.ideal_functions[0].y_values)
-            
-            # We need X values - get them from the training data or the original ideal CSV
-            try:
-                import pandas as pd
-                ideal_df = pd.read_csv("Data/ideal.csv")
-                x_values = ideal_df["x"].values
-            except:
+
+            # X values were carried forward from the ideal CSV in load_data
+            if self.ideal_x_values is not None:
+                x_values = self.ideal_x_values
+            else:
                 # Fallback: use indices
                 x_values = list(range(num_points))
-            
-            # Transpose: for each X coordinate, create a row with 50 Y values
-            for x_idx in range(num_points):
-                y_dict = {}
-                for ideal_idx, ideal_func in enumerate(self.ideal_functions):
-                    y_dict[f"y{ideal_idx + 1}"] = ideal_func.y_values[x_idx]
-                
-                db_record = IdealFunctionDB(
-                    x=float(x_values[x_idx]),
-                    **y_dict
-                )
-                session.add(db_record)
 
-            session.commit()
+            # Transpose: for each X coordinate, create a row with 50 Y values
+            ymat = self.ideal_mat.T
+            rows = []
+            for x, y_row in zip(
+                np.asarray(x_values, dtype=np.float64).tolist(), ymat.tolist()
+            ):
+                row = dict(zip(IDEAL_Y_KEYS, y_row))
+                row["x"] = x
+                rows.append(row)
+            self.db.bulk_insert_ideal(rows, conn)
             print(f"  [OK] Populated ideal functions: {num_points} records")
 
         except Exception as e:
-            if session:
-                session.rollback()
             raise DatabaseError(f"Error populating ideal functions: {str(e)}") from e
-        finally:
-            if session:
-                session.close()
 
     def select_ideal_functions(self) -> None:
         """
@@ -215,7 +238,7 @@ class Application:
 
             training_data = list(self.training_data_sets.values())[0]
             self.selected_ideal_functions = self.selector.select_all_ideal_functions(
-                training_data, self.ideal_functions
+                training_data, self.ideal_functions, self.ideal_mat
             )
 
             for key, value in self.selected_ideal_functions.items():
@@ -237,34 +260,50 @@ class Application:
         try:
             print("Mapping test data to ideal functions...")
 
-            if not self.test_data or not self.selected_ideal_functions:
+            if self.test_file is None or not self.selected_ideal_functions:
                 raise ValueError("Test data or selected ideal functions not available")
 
+            if self.ideal_x_values is None:
+                raise ValueError("Ideal function X values not available")
+
             mapper = TestDataMapper(self.db)
-            
-            # Map using the first training dataset (Y1)
-            training_data = list(self.training_data_sets.values())[0]
-            training_y_values = [t.y_values[0] for t in training_data]
-            
+
             # For simplicity, map all test points to y1's ideal function
             selected_y1 = self.selected_ideal_functions.get('y1', {})
             ideal_func_index = selected_y1.get('index', 0)
             max_deviation = selected_y1.get('max_deviation', 0)
-            
+
+            ideal_func = self.ideal_functions[ideal_func_index]
+            ideal_function_no = ideal_func_index + 1
+
+            pending: List[dict] = []
+            total_count = 0
             mapped_count = 0
-            for test_point in self.test_data:
-                result = mapper.map_test_point(
-                    test_point,
-                    self.ideal_functions,
-                    ideal_func_index,
-                    max_deviation,
+            for test_x, test_y in self.test_loader.iter_test_data(self.test_file):
+                deviations, mask = mapper.map_points(
+                    test_x, test_y, ideal_func, max_deviation
                 )
-                if result is not None:
-                    mapped_count += 1
-
-            # Save to database
-            mapper.save_to_database(self.test_data)
-            print(f"  [OK] Mapped test data: {mapped_count}/{len(self.test_data)} points")
+                mapped_count += int(mask.sum())
+                total_count += len(test_x)
+
+                for x, y, deviation, matched in zip(
+                    test_x.tolist(), test_y.tolist(), deviations.tolist(), mask.tolist()
+                ):
+                    pending.append({
+                        "x": x,
+                        "y": y,
+                        "delta_y": deviation if matched else None,
+                        "ideal_function_no": ideal_function_no if matched else None,
+                    })
+
+                if len(pending) >= TEST_INSERT_BATCH_SIZE:
+                    mapper.save_rows(pending)
+                    pending = []
+
+            if pending:
+                mapper.save_rows(pending)
+            self.db.finalize_load()
+            print(f"  [OK] Mapped test data: {mapped_count}/{total_count} points")
 
         except Exception as e:
             raise MappingError(f"Error mapping test data: {str(e)}") from e
@@ -288,8 +327,7 @@ class Application:
             for i in range(4):
                 selected = self.selected_ideal_functions.get(f'y{i+1}', {})
                 ideal_idx = selected.get('index', 0)
-                # Note: In a real implementation, you'd plot the actual ideal function
-                # Here we're using the first point as a placeholder
+                # Overlay the ideal function selected for training column y{i+1}
                 self.visualizer.plot_training_data_with_ideal_function(
                     training_data,
                     self.ideal_functions[ideal_idx],
@@ -348,6 +386,8 @@ class Application:
 
 def main() -> None:
     """Main entry point for the application."""
+    create_directories()
+
     # Define file paths from the Data folder
     data_dir = "Data"
     training_files = [
@@ -0,0 +1,59 @@
+"""
+Optional Numba kernel for the Least Squares ideal function selection.
+
+The kernel is only compiled when numba is installed. Callers should check
+NUMBA_AVAILABLE and fall back to the NumPy implementation otherwise.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def select_all(train, ideal):
+        """
+        Select the best ideal function for every training column.
+
+        Unlike the broadcast version, no (num_train, num_ideal, N)
+        difference tensor is materialized.
+
+        Args:
+            train: Float64 matrix of shape (num_train, N).
+            ideal: Float64 matrix of shape (num_ideal, N).
+
+        Returns:
+            Tuple of (best_idx, min_dev, dev_per_pt) with shapes
+            (num_train,), (num_train,) and (num_train, N).
+        """
+        num_train, num_points = train.shape
+        num_ideal = ideal.shape[0]
+        best_idx = np.empty(num_train, dtype=np.int64)
+        min_dev = np.empty(num_train, dtype=np.float64)
+        dev_per_pt = np.empty((num_train, num_points), dtype=np.float64)
+
+        for k in prange(num_train):
+            best = 0
+            best_ssd = 0.0
+            for j in range(num_ideal):
+                acc = 0.0
+                for i in range(num_points):
+                    d = train[k, i] - ideal[j, i]
+                    acc += d * d
+                # Seeded from the first function; fastmath assumes no infinities
+                if j == 0 or acc < best_ssd:
+                    best_ssd = acc
+                    best = j
+            best_idx[k] = best
+            min_dev[k] = best_ssd
+            for i in range(num_points):
+                dev_per_pt[k, i] = abs(train[k, i] - ideal[best, i])
+
+        return best_idx, min_dev, dev_per_pt
@@ -0,0 +1,76 @@
+"""
+Optional Numba kernel for mapping test points to the selected ideal functions.
+
+The kernel is only compiled when numba is installed. Callers should check
+NUMBA_AVAILABLE and fall back to the NumPy implementation otherwise.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def map_points(xs, ys, ideal_xs, ideal_ys, thresholds):
+        """
+        Assign each test point to the closest ideal function within its threshold.
+
+        The nearest-X lookup, deviation and threshold check are fused into a
+        single pass per test point, so no intermediate arrays are allocated.
+        Among the functions within their threshold, the one with the smallest
+        deviation wins; ties go to the earlier function.
+
+        Args:
+            xs: Test X values, shape (num_test,).
+            ys: Test Y values, shape (num_test,).
+            ideal_xs: Sorted X values per selected function, shape (num_funcs, N).
+            ideal_ys: Y values matching ideal_xs, shape (num_funcs, N).
+            thresholds: Allowed deviation per selected function, shape (num_funcs,).
+
+        Returns:
+            Tuple of (assigned, delta_y): the index of the assigned function
+            (-1 if none) and the deviation from it, both shape (num_test,).
+        """
+        num_test = xs.shape[0]
+        num_funcs, num_points = ideal_xs.shape
+        assigned = np.full(num_test, -1, dtype=np.int64)
+        delta_y = np.zeros(num_test, dtype=np.float64)
+
+        for t in prange(num_test):
+            x = xs[t]
+            for f in range(num_funcs):
+                # Binary search for the insertion point (searchsorted, side="left")
+                lo = 0
+                hi = num_points
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if ideal_xs[f, mid] < x:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+
+                if num_points == 1:
+                    j = 0
+                else:
+                    pos = min(max(lo, 1), num_points - 1)
+                    if abs(x - ideal_xs[f, pos - 1]) <= abs(ideal_xs[f, pos] - x):
+                        j = pos - 1
+                    else:
+                        j = pos
+
+                deviation = abs(ys[t] - ideal_ys[f, j])
+                # Keep the smallest deviation among functions within threshold
+                if deviation <= thresholds[f] and (
+                    assigned[t] == -1 or deviation < delta_y[t]
+                ):
+                    assigned[t] = f
+                    delta_y[t] = deviation
+
+        return assigned, delta_y
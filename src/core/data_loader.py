@@ -5,11 +5,82 @@ This module provides classes for loading training data, ideal functions,
 and test data from CSV files.
 """
 
+import csv
+import os
+from functools import lru_cache
+import numpy as np
 import pandas as pd
-from typing import List, Tuple
-from src.models.models import TrainingData, IdealFunction, TestData
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from src.models.models import (
+    TrainingData,
+    TrainingDataset,
+    IdealFunction,
+    IdealDataset,
+    TestData,
+)
 from src.utils.exceptions import DataLoadError, InvalidDataError
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+
+@lru_cache(maxsize=4)
+def _read_csv_cached(path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    """
+    Parse a CSV file, memoized per file version.
+
+    The modification time and size are part of the cache key, so a changed
+    file is parsed again on the next call. The returned DataFrame is shared
+    between callers and must not be modified; DataLoader.load_csv hands
+    out copies.
+
+    Args:
+        path: Path to the CSV file.
+        mtime_ns: Modification time of the file in nanoseconds.
+        size: Size of the file in bytes.
+
+    Returns:
+        Parsed DataFrame.
+    """
+    if pa_csv is not None:
+        try:
+            return _read_float_csv(path)
+        except pa.ArrowInvalid:
+            # Non-numeric cells: parse untyped so the loaders can report them
+            pass
+    return pd.read_csv(path)
+
+
+def _read_float_csv(path: str) -> pd.DataFrame:
+    """
+    Parse a CSV file with Arrow's multithreaded reader, typing every column as float64.
+
+    Args:
+        path: Path to the CSV file.
+
+    Returns:
+        DataFrame backed by one float64 matrix.
+
+    Raises:
+        pyarrow.ArrowInvalid: If a cell is not a number or the file is malformed.
+    """
+    with open(path, newline="") as f:
+        header = next(csv.reader(f), [])
+    table = pa_csv.read_csv(
+        path,
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.float64() for name in header}
+        ),
+    )
+    values = np.stack(
+        [table.column(name).to_numpy() for name in table.column_names], axis=1
+    )
+    return pd.DataFrame(values, columns=table.column_names, copy=False)
+
 
 class DataLoader:
     """
@@ -24,21 +95,28 @@ class DataLoader:
         """
         Load a CSV file into a pandas DataFrame.
 
+        Numeric files are read with pyarrow's CSV reader as float64 columns
+        when pyarrow is installed; otherwise pandas' C parser is used. Parsed files are cached and
+        reused until their modification time or size changes.
+
         Args:
             file_path: Path to the CSV file.
 
         Returns:
-            Loaded DataFrame.
+            Loaded DataFrame, owned by the caller.
 
         Raises:
             DataLoadError: If the file cannot be loaded.
         """
         try:
-            return pd.read_csv(file_path)
+            st = os.stat(file_path)
+            df = _read_csv_cached(os.fspath(file_path), st.st_mtime_ns, st.st_size)
         except FileNotFoundError as e:
             raise DataLoadError(f"File not found: {file_path}") from e
         except Exception as e:
             raise DataLoadError(f"Error loading CSV file {file_path}: {str(e)}") from e
+        # The cached frame is shared, so callers get their own copy
+        return df.copy()
 
     @staticmethod
     def validate_dataframe(df: pd.DataFrame, expected_columns: List[str]) -> None:
@@ -80,19 +158,38 @@ class TrainingDataLoader(DataLoader):
             DataLoadError: If the file cannot be loaded.
             InvalidDataError: If data validation fails.
         """
+        dataset, df = self._load(file_path)
+        return dataset.rows, df
+
+    def load_training_dataset(self, file_path: str) -> TrainingDataset:
+        """
+        Load training data from a CSV file as column arrays.
+
+        Args:
+            file_path: Path to the training data CSV file.
+
+        Returns:
+            TrainingDataset with x of shape (N,) and Y of shape (N, 4).
+
+        Raises:
+            DataLoadError: If the file cannot be loaded.
+            InvalidDataError: If data validation fails.
+        """
+        dataset, _ = self._load(file_path)
+        return dataset
+
+    def _load(self, file_path: str) -> Tuple[TrainingDataset, pd.DataFrame]:
+        """Read and validate a training CSV file into a TrainingDataset."""
         df = self.load_csv(file_path)
         expected_cols = ["x", "y1", "y2", "y3", "y4"]
         self.validate_dataframe(df, expected_cols)
 
         try:
-            training_data = []
-            for _, row in df.iterrows():
-                data = TrainingData(
-                    x=float(row["x"]),
-                    y_values=[float(row["y1"]), float(row["y2"]), float(row["y3"]), float(row["y4"])],
-                )
-                training_data.append(data)
-            return training_data, df
+            dataset = TrainingDataset(
+                x=df["x"].to_numpy(dtype=np.float64),
+                Y=df[["y1", "y2", "y3", "y4"]].to_numpy(dtype=np.float64),
+            )
+            return dataset, df
         except Exception as e:
             raise InvalidDataError(f"Error processing training data: {str(e)}") from e
 
@@ -102,8 +199,21 @@ class IdealFunctionLoader(DataLoader):
     Loader for ideal functions from CSV files.
 
     Expects CSV files with columns: x, y1, y2, ..., y50
+
+    When caching is enabled, the parsed values are stored next to the CSV
+    as a ``.npy`` file and memory-mapped on later loads, as long as the
+    cache is newer than the CSV.
     """
 
+    def __init__(self, use_cache: bool = False) -> None:
+        """
+        Initialize the ideal function loader.
+
+        Args:
+            use_cache: Whether to persist and reuse a ``.npy`` cache of the CSV.
+        """
+        self.use_cache = use_cache
+
     def load_ideal_functions(self, file_path: str) -> Tuple[List[IdealFunction], pd.DataFrame]:
         """
         Load ideal functions from a CSV file.
@@ -125,32 +235,102 @@ class IdealFunctionLoader(DataLoader):
             DataLoadError: If the file cannot be loaded.
             InvalidDataError: If data validation fails.
         """
-        df = self.load_csv(file_path)
+        dataset, df = self._load(file_path)
+        try:
+            if df is None:
+                # Cache hit: build the frame from the mapped arrays on demand
+                df = pd.DataFrame(
+                    np.column_stack((dataset.x, dataset.Y)),
+                    columns=["x"] + [f"y{i}" for i in range(1, 51)],
+                )
+            return dataset.functions, df
+        except Exception as e:
+            raise InvalidDataError(f"Error processing ideal functions: {str(e)}") from e
+
+    def load_ideal_dataset(self, file_path: str) -> IdealDataset:
+        """
+        Load ideal functions from a CSV file as column arrays.
+
+        Args:
+            file_path: Path to the ideal functions CSV file.
+
+        Returns:
+            IdealDataset with x of shape (N,) and Y of shape (N, 50).
+
+        Raises:
+            DataLoadError: If the file cannot be loaded.
+            InvalidDataError: If data validation fails.
+        """
+        dataset, _ = self._load(file_path)
+        return dataset
+
+    def _load(self, file_path: str) -> Tuple[IdealDataset, Optional[pd.DataFrame]]:
+        """
+        Read and validate an ideal functions CSV file into an IdealDataset.
+
+        The DataFrame is None when the values came from the ``.npy`` cache.
+        """
         expected_cols = ["x"] + [f"y{i}" for i in range(1, 51)]
-        self.validate_dataframe(df, expected_cols)
+        mat = self._load_cached_matrix(file_path) if self.use_cache else None
+
+        df = None
+        if mat is None:
+            df = self.load_csv(file_path)
+            self.validate_dataframe(df, expected_cols)
 
         try:
-            ideal_functions = []
-            
-            # We need to transpose: create 50 IdealFunction objects
-            # Each representing one of the 50 ideal functions across all X values
-            x_values = df["x"].values
-            
-            for ideal_idx in range(1, 51):  # For each of the 50 ideal functions
-                y_col = f"y{ideal_idx}"
-                y_values = df[y_col].values.tolist()
-                
-                # Create IdealFunction with first x value (we'll use x values from training data)
-                # Actually, we need to store all X coordinates
-                # Let's create a pseudo-IdealFunction for comparison
-                # For now, use x=0 as placeholder since we compare Y values by index
-                func = IdealFunction(x=float(x_values[0]), y_values=y_values)
-                ideal_functions.append(func)
-                
-            return ideal_functions, df
+            if mat is None:
+                # Transpose once: row 0 holds X, rows 1-50 hold one ideal function each
+                mat = np.ascontiguousarray(
+                    df[expected_cols].to_numpy(dtype=np.float64).T
+                )
+                if self.use_cache:
+                    self._save_cached_matrix(file_path, mat)
+
+            # Y is a transposed view, so each function's values stay contiguous
+            return IdealDataset(x=mat[0], Y=mat[1:].T), df
         except Exception as e:
             raise InvalidDataError(f"Error processing ideal functions: {str(e)}") from e
 
+    @staticmethod
+    def _cache_path(file_path: str) -> Path:
+        """Return the ``.npy`` cache path belonging to a CSV file."""
+        return Path(file_path).with_suffix(".npy")
+
+    def _load_cached_matrix(self, file_path: str) -> Optional[np.ndarray]:
+        """
+        Memory-map the cached (51, N) matrix if it is newer than the CSV.
+
+        Args:
+            file_path: Path to the ideal functions CSV file.
+
+        Returns:
+            Read-only matrix, or None if there is no usable cache.
+        """
+        cache = self._cache_path(file_path)
+        try:
+            if cache.stat().st_mtime < os.stat(file_path).st_mtime:
+                return None
+            mat = np.load(cache, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if mat.ndim != 2 or mat.shape[0] != 51:
+            return None
+        return mat
+
+    def _save_cached_matrix(self, file_path: str, mat: np.ndarray) -> None:
+        """
+        Persist the parsed matrix next to the CSV, ignoring write failures.
+
+        Args:
+            file_path: Path to the ideal functions CSV file.
+            mat: Matrix with X in row 0 and the ideal functions in rows 1-50.
+        """
+        try:
+            np.save(self._cache_path(file_path), mat)
+        except OSError:
+            pass
+
 
 class TestDataLoader(DataLoader):
     """
@@ -178,10 +358,72 @@ class TestDataLoader(DataLoader):
         self.validate_dataframe(df, expected_cols)
 
         try:
-            test_data = []
-            for _, row in df.iterrows():
-                data = TestData(x=float(row["x"]), y=float(row["y"]))
-                test_data.append(data)
+            xs = df["x"].to_numpy(dtype=np.float64).tolist()
+            ys = df["y"].to_numpy(dtype=np.float64).tolist()
+            test_data = [TestData(x=x, y=y) for x, y in zip(xs, ys)]
             return test_data, df
         except Exception as e:
             raise InvalidDataError(f"Error processing test data: {str(e)}") from e
+
+    def validate_test_file(self, file_path: str) -> None:
+        """
+        Check that a test data CSV file can be opened and has the expected header.
+
+        Only the header is read, so this is cheap even for large files that
+        are later streamed with iter_test_data.
+
+        Args:
+            file_path: Path to the test data CSV file.
+
+        Raises:
+            DataLoadError: If the file cannot be loaded.
+            InvalidDataError: If expected columns are missing.
+        """
+        try:
+            header = pd.read_csv(file_path, nrows=0)
+        except FileNotFoundError as e:
+            raise DataLoadError(f"File not found: {file_path}") from e
+        except Exception as e:
+            raise DataLoadError(f"Error loading CSV file {file_path}: {str(e)}") from e
+        self.validate_dataframe(header, ["x", "y"])
+
+    def iter_test_data(
+        self, file_path: str, chunksize: int = 8192
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Stream test data from a CSV file in fixed-size chunks.
+
+        Only one chunk is held in memory at a time, so arbitrarily large
+        test files can be processed with constant memory.
+
+        Args:
+            file_path: Path to the test data CSV file.
+            chunksize: Number of rows per chunk.
+
+        Yields:
+            Tuples of (x values, y values) as float64 arrays.
+
+        Raises:
+            DataLoadError: If the file cannot be loaded.
+            InvalidDataError: If data validation fails.
+        """
+        expected_cols = ["x", "y"]
+        try:
+            reader = pd.read_csv(file_path, chunksize=chunksize, dtype=np.float64)
+        except FileNotFoundError as e:
+            raise DataLoadError(f"File not found: {file_path}") from e
+        except Exception as e:
+            raise DataLoadError(f"Error loading CSV file {file_path}: {str(e)}") from e
+
+        with reader:
+            try:
+                for chunk in reader:
+                    self.validate_dataframe(chunk, expected_cols)
+                    yield (
+                        chunk["x"].to_numpy(dtype=np.float64),
+                        chunk["y"].to_numpy(dtype=np.float64),
+                    )
+            except InvalidDataError:
+                raise
+            except Exception as e:
+                raise InvalidDataError(f"Error processing test data: {str(e)}") from e
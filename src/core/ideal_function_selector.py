@@ -5,9 +5,12 @@ This module implements the algorithm to select the best matching ideal function
 for each training dataset using the least squares method.
 """
 
+import warnings
 import numpy as np
-from typing import List, Tuple
-from src.models.models import TrainingData, IdealFunction
+from typing import List, Optional, Tuple, Union
+from src.core import _ls_kernel
+from src.core._ls_kernel import NUMBA_AVAILABLE
+from src.models.models import TrainingData, TrainingDataset, IdealFunction
 from src.utils.exceptions import MappingError
 
 
@@ -20,6 +23,22 @@ class IdealFunctionSelector:
     minimum deviation.
     """
 
+    @staticmethod
+    def _stack(ideal_functions: List[IdealFunction]) -> np.ndarray:
+        """
+        Stack the ideal functions into a (num_functions, num_points) matrix.
+
+        Built on every call so changes to the list or its functions are
+        always picked up; callers that reuse a matrix pass it in instead.
+
+        Args:
+            ideal_functions: List of all ideal functions.
+
+        Returns:
+            Float64 matrix with one row per ideal function.
+        """
+        return np.asarray([f.y_values for f in ideal_functions], dtype=np.float64)
+
     @staticmethod
     def calculate_squared_deviations(
         training_y: float, ideal_y: float
@@ -33,19 +52,30 @@ class IdealFunctionSelector:
 
         Returns:
             Squared deviation.
+
+        .. deprecated::
+            Use :meth:`select_all_ideal_functions`, which computes all
+            deviations in a single vectorized operation.
         """
+        warnings.warn(
+            "calculate_squared_deviations is deprecated; "
+            "use select_all_ideal_functions instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         return (training_y - ideal_y) ** 2
 
     @staticmethod
     def sum_squared_deviations(
-        training_y_values: List[float], ideal_y_values: List[float]
+        training_y_values: Union[np.ndarray, List[float]],
+        ideal_y_values: Union[np.ndarray, List[float]],
     ) -> float:
         """
         Calculate the sum of squared deviations between training and ideal data.
 
         Args:
-            training_y_values: List of Y values from training data.
-            ideal_y_values: List of Y values from ideal function.
+            training_y_values: Y values from training data.
+            ideal_y_values: Y values from ideal function.
 
         Returns:
             Sum of squared deviations.
@@ -56,14 +86,38 @@ class IdealFunctionSelector:
         if len(training_y_values) != len(ideal_y_values):
             raise ValueError("Training and ideal function lists must have the same length")
         
-        return sum(
-            IdealFunctionSelector.calculate_squared_deviations(t, i)
-            for t, i in zip(training_y_values, ideal_y_values)
+        diff = np.asarray(training_y_values, dtype=np.float64) - np.asarray(
+            ideal_y_values, dtype=np.float64
         )
+        return float(np.dot(diff, diff))
+
+    @staticmethod
+    def ssd_all(Y_train_col: np.ndarray, Y_ideal: np.ndarray) -> np.ndarray:
+        """
+        Calculate the sum of squared deviations against every ideal function at once.
+
+        Args:
+            Y_train_col: Y values of one training dataset, shape (N,).
+            Y_ideal: Y values of the ideal functions, shape (N, num_functions).
+
+        Returns:
+            Sum of squared deviations per ideal function, shape (num_functions,).
+
+        Raises:
+            ValueError: If the number of points differs.
+        """
+        Y_train_col = np.asarray(Y_train_col, dtype=np.float64)
+        if Y_ideal.shape[0] != len(Y_train_col):
+            raise ValueError("Training and ideal function lists must have the same length")
+
+        # One temporary, squared in place
+        tmp = np.subtract(Y_ideal, Y_train_col[:, None])
+        np.square(tmp, out=tmp)
+        return tmp.sum(axis=0)
 
     def select_ideal_function(
         self,
-        training_data: List[TrainingData],
+        training_data: Union[TrainingDataset, List[TrainingData]],
         ideal_functions: List[IdealFunction],
         training_index: int,
     ) -> Tuple[int, float, List[float]]:
@@ -71,7 +125,7 @@ class IdealFunctionSelector:
         Select the best matching ideal function for a training dataset.
 
         Args:
-            training_data: List of all training data points.
+            training_data: Training data as a TrainingDataset or a list of points.
             ideal_functions: List of all ideal functions.
             training_index: Index of the training dataset to match (0-3 for Y1-Y4).
 
@@ -89,32 +143,25 @@ class IdealFunctionSelector:
             raise ValueError(f"Training index must be 0-3, got {training_index}")
 
         try:
-            min_deviation = float("inf")
-            best_function_index = -1
-            deviations_per_point = []
-
-            # For each ideal function, calculate total squared deviation
-            for ideal_idx, ideal_func in enumerate(ideal_functions):
-                # Extract Y values for the specific training dataset
-                training_y_values = [
-                    t.y_values[training_index] for t in training_data
-                ]
-
-                # Calculate sum of squared deviations
-                ssd = self.sum_squared_deviations(training_y_values, ideal_func.y_values)
+            # Extract Y values for the specific training dataset once
+            if isinstance(training_data, TrainingDataset):
+                training_y_values = training_data.Y[:, training_index]
+            else:
+                training_y_values = np.asarray(
+                    [t.y_values[training_index] for t in training_data],
+                    dtype=np.float64,
+                )
 
-                # Track the best match
-                if ssd < min_deviation:
-                    min_deviation = ssd
-                    best_function_index = ideal_idx
+            # Sum of squared deviations against all ideal functions at once
+            ssds = self.ssd_all(training_y_values, self._stack(ideal_functions).T)
+            best_function_index = int(np.argmin(ssds))
+            min_deviation = float(ssds[best_function_index])
 
             # Calculate deviations per point for the selected function
             selected_ideal = ideal_functions[best_function_index]
-            training_y_values = [t.y_values[training_index] for t in training_data]
-            deviations_per_point = [
-                abs(t_y - i_y)
-                for t_y, i_y in zip(training_y_values, selected_ideal.y_values)
-            ]
+            deviations_per_point = np.abs(
+                training_y_values - selected_ideal.y_values
+            ).tolist()
 
             return best_function_index, min_deviation, deviations_per_point
 
@@ -123,15 +170,18 @@ class IdealFunctionSelector:
 
     def select_all_ideal_functions(
         self,
-        training_data: List[TrainingData],
+        training_data: Union[TrainingDataset, List[TrainingData]],
         ideal_functions: List[IdealFunction],
+        ideal_mat: Optional[np.ndarray] = None,
     ) -> dict:
         """
         Select the best matching ideal function for all four training datasets.
 
         Args:
-            training_data: List of all training data points.
+            training_data: Training data as a TrainingDataset or a list of points.
             ideal_functions: List of all ideal functions.
+            ideal_mat: Optional precomputed (num_functions, num_points) matrix of
+                the ideal Y values; built from ideal_functions if omitted.
 
         Returns:
             Dictionary with keys 'y1', 'y2', 'y3', 'y4' containing:
@@ -144,19 +194,36 @@ class IdealFunctionSelector:
             MappingError: If selection process fails.
         """
         try:
+            if ideal_mat is None:
+                ideal_mat = self._stack(ideal_functions)
+            if isinstance(training_data, TrainingDataset):
+                train_mat = np.ascontiguousarray(training_data.Y.T, dtype=np.float64)
+            else:
+                train_mat = np.asarray(
+                    [[t.y_values[k] for t in training_data] for k in range(4)],
+                    dtype=np.float64,
+                )
+
+            if NUMBA_AVAILABLE:
+                best, min_dev, dev_per_pt = _ls_kernel.select_all(train_mat, ideal_mat)
+            else:
+                # (4, 1, N) - (1, 50, N) -> (4, 50, N), reduced to (4, 50)
+                diff = train_mat[:, None, :] - ideal_mat[None, :, :]
+                ssd = np.einsum("tij,tij->ti", diff, diff)
+                best = ssd.argmin(axis=1)
+                min_dev = ssd[np.arange(4), best]
+                dev_per_pt = np.abs(train_mat - ideal_mat[best])
+            max_dev = dev_per_pt.max(axis=1) if dev_per_pt.shape[1] else np.zeros(4)
+
             results = {}
             for training_idx in range(4):
-                func_idx, min_dev, deviations = self.select_ideal_function(
-                    training_data, ideal_functions, training_idx
-                )
-                
                 results[f"y{training_idx + 1}"] = {
-                    "index": func_idx,
-                    "min_deviation": min_dev,
-                    "max_deviation": max(deviations) if deviations else 0,
-                    "deviations": deviations,
+                    "index": int(best[training_idx]),
+                    "min_deviation": float(min_dev[training_idx]),
+                    "max_deviation": float(max_dev[training_idx]),
+                    "deviations": dev_per_pt[training_idx].tolist(),
                 }
-            
+
             return results
         except Exception as e:
             raise MappingError(f"Error selecting all ideal functions: {str(e)}") from e
@@ -5,11 +5,13 @@ This module maps test data points to the selected ideal functions based on
 deviation thresholds.
 """
 
-import math
-from typing import List, Optional
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from src.core import _map_kernel
+from src.core._map_kernel import NUMBA_AVAILABLE
 from src.models.models import TestData, IdealFunction
-from src.database.database import Database, TestDataDB
-from sqlalchemy.orm import Session
+from src.database.database import Database
+from src.utils.config import SQRT_2
 from src.utils.exceptions import MappingError
 
 
@@ -29,6 +31,41 @@ class TestDataMapper:
             db: Database instance for storing results.
         """
         self.db = db
+        # id(ideal_func) -> (ideal_func, sorted X values, sort order or None)
+        self._x_cache: Dict[int, Tuple[IdealFunction, np.ndarray, Optional[np.ndarray]]] = {}
+
+    def clear_cache(self) -> None:
+        """Clear the cached per-function X lookup arrays."""
+        self._x_cache.clear()
+
+    def _sorted_x(self, ideal_func: IdealFunction) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Get the sorted X values of an ideal function, computed once per function.
+
+        Args:
+            ideal_func: The ideal function.
+
+        Returns:
+            Tuple of (sorted X values, sort order), where the sort order is
+            None if the X values were already sorted.
+        """
+        cached = self._x_cache.get(id(ideal_func))
+        if cached is not None and cached[0] is ideal_func:
+            return cached[1], cached[2]
+
+        if ideal_func.x_values is not None:
+            ideal_x = np.asarray(ideal_func.x_values, dtype=np.float64)
+        else:
+            # Without stored X values, assume points are at their indices
+            ideal_x = np.arange(len(ideal_func.y_values), dtype=np.float64)
+
+        order = None
+        if np.any(ideal_x[1:] < ideal_x[:-1]):
+            order = np.argsort(ideal_x, kind="stable")
+            ideal_x = ideal_x[order]
+
+        self._x_cache[id(ideal_func)] = (ideal_func, ideal_x, order)
+        return ideal_x, order
 
     def map_test_point(
         self,
@@ -36,6 +73,7 @@ class TestDataMapper:
         ideal_functions: List[IdealFunction],
         selected_ideal_index: int,
         max_training_deviation: float,
+        threshold: Optional[float] = None,
     ) -> Optional[int]:
         """
         Map a single test point to an ideal function.
@@ -45,6 +83,8 @@ class TestDataMapper:
             ideal_functions: List of all ideal functions.
             selected_ideal_index: Index of the selected ideal function for this training set.
             max_training_deviation: Maximum deviation from training data.
+            threshold: Precomputed max_training_deviation * sqrt(2); computed
+                from max_training_deviation if omitted.
 
         Returns:
             The index of the assigned ideal function, or None if no match.
@@ -69,8 +109,9 @@ class TestDataMapper:
             deviation = abs(test_point.y - ideal_y)
             
             # Calculate the threshold: max_deviation * sqrt(2)
-            threshold = max_training_deviation * math.sqrt(2)
-            
+            if threshold is None:
+                threshold = max_training_deviation * SQRT_2
+
             # Check if deviation is within threshold
             if deviation <= threshold:
                 test_point.delta_y = deviation
@@ -100,47 +141,143 @@ class TestDataMapper:
                                    and their deviations.
 
         Returns:
-            List of mapped TestData objects.
+            List of new TestData objects carrying the mapping results; the
+            input objects are not modified.
 
         Raises:
             MappingError: If mapping fails.
         """
         try:
-            mapped_test_data = []
-            
-            for test_point in test_data:
-                # Try to map to one of the four selected ideal functions
-                mapped = False
-                
-                for i, key in enumerate(['y1', 'y2', 'y3', 'y4']):
-                    if key not in selected_ideal_indices:
-                        continue
-                    
-                    max_dev = selected_ideal_indices[key].get('max_deviation', 0)
-                    ideal_idx = selected_ideal_indices[key].get('index')
-                    
-                    result = self.map_test_point(
-                        test_point,
-                        ideal_functions,
-                        ideal_idx,
-                        max_dev,
-                    )
-                    
-                    if result is not None:
-                        mapped_test_data.append(test_point)
-                        mapped = True
-                        break
-                
-                # If not mapped to any function, still store with null values
-                if not mapped:
-                    test_point.delta_y = None
-                    test_point.ideal_function_no = None
-                    mapped_test_data.append(test_point)
-            
-            return mapped_test_data
+            keys = [key for key in ("y1", "y2", "y3", "y4") if key in selected_ideal_indices]
+            num_test = len(test_data)
+            xs = np.fromiter((t.x for t in test_data), dtype=np.float64, count=num_test)
+            ys = np.fromiter((t.y for t in test_data), dtype=np.float64, count=num_test)
+
+            selected_funcs = []
+            max_deviations = np.empty(len(keys), dtype=np.float64)
+            function_nos = []
+            for col, key in enumerate(keys):
+                ideal_idx = selected_ideal_indices[key].get("index")
+                selected_funcs.append(ideal_functions[ideal_idx])
+                max_deviations[col] = selected_ideal_indices[key].get("max_deviation", 0)
+                function_nos.append(ideal_idx + 1)
+            # Scaled once on the whole array
+            thresholds = max_deviations * SQRT_2
+
+            if not keys:
+                choice = np.zeros(num_test, dtype=np.intp)
+                matched = np.zeros(num_test, dtype=bool)
+                delta_y = np.zeros(num_test, dtype=np.float64)
+            elif NUMBA_AVAILABLE and len({len(f.y_values) for f in selected_funcs}) == 1:
+                ideal_xs, ideal_ys = self._stack_sorted(selected_funcs)
+                choice, delta_y = _map_kernel.map_points(xs, ys, ideal_xs, ideal_ys, thresholds)
+                matched = choice >= 0
+            else:
+                # (num_test, num_keys) deviations against each selected ideal function
+                deviations = np.empty((num_test, len(keys)), dtype=np.float64)
+                for col, ideal_func in enumerate(selected_funcs):
+                    ideal_y = ideal_func.y_values
+                    closest = self.find_closest_indices(ideal_func, xs)
+                    deviations[:, col] = np.abs(ys - ideal_y[closest])
+
+                # Best match per row: out-of-threshold deviations become inf,
+                # so argmin picks the smallest deviation among valid functions
+                rows = np.arange(num_test)
+                masked = np.where(deviations <= thresholds, deviations, np.inf)
+                choice = masked.argmin(axis=1)
+                delta_y = masked[rows, choice]
+                matched = np.isfinite(delta_y)
+
+            # If not mapped to any function, still store with null values
+            matched_list = matched.tolist()
+            deltas = [
+                delta if is_matched else None
+                for delta, is_matched in zip(delta_y.tolist(), matched_list)
+            ]
+            assigned_nos = [
+                function_nos[col] if is_matched else None
+                for col, is_matched in zip(choice.tolist(), matched_list)
+            ]
+            return TestData.from_arrays(xs, ys, deltas, assigned_nos)
         except Exception as e:
             raise MappingError(f"Error mapping all test data: {str(e)}") from e
 
+    def _stack_sorted(
+        self, ideal_funcs: List[IdealFunction]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stack the sorted X values and matching Y values of several ideal functions.
+
+        Args:
+            ideal_funcs: Ideal functions with the same number of points.
+
+        Returns:
+            Tuple of (X matrix, Y matrix), each of shape (len(ideal_funcs), N).
+        """
+        ideal_xs = []
+        ideal_ys = []
+        for ideal_func in ideal_funcs:
+            ideal_x, order = self._sorted_x(ideal_func)
+            ideal_y = ideal_func.y_values
+            ideal_xs.append(ideal_x)
+            ideal_ys.append(ideal_y if order is None else ideal_y[order])
+        return np.stack(ideal_xs), np.stack(ideal_ys)
+
+    def map_points(
+        self,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        ideal_func: IdealFunction,
+        max_training_deviation: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Check a batch of test points against one ideal function.
+
+        Applies the same rule as map_test_point and map_all_test_data: a
+        point matches if its deviation from the ideal Y at the nearest X is
+        at most max_training_deviation * sqrt(2). Suited to test data that
+        is streamed in chunks.
+
+        Args:
+            xs: Test X values.
+            ys: Test Y values.
+            ideal_func: The selected ideal function.
+            max_training_deviation: Maximum deviation from training data.
+
+        Returns:
+            Tuple of (deviations, matched): the float64 absolute deviation of
+            every point and a boolean mask of the points within the threshold.
+        """
+        closest = self.find_closest_indices(ideal_func, xs)
+        deviations = np.abs(ys - ideal_func.y_values[closest])
+        return deviations, deviations <= max_training_deviation * SQRT_2
+
+    def find_closest_indices(self, ideal_func: IdealFunction, xs: np.ndarray) -> np.ndarray:
+        """
+        Find the indices of the ideal function points closest to each X value.
+
+        Uses a single binary search over the sorted ideal X values, so the
+        lookup is O(N_test log N_ideal) instead of a scan per test point.
+        Unsorted X values are sorted once and the result is cached.
+
+        Args:
+            ideal_func: The ideal function.
+            xs: Target X values.
+
+        Returns:
+            Integer array of closest point indices, one per target X value.
+        """
+        ideal_x, order = self._sorted_x(ideal_func)
+        if len(ideal_x) == 1:
+            # A single point is the closest one for every target
+            return np.zeros(len(xs), dtype=np.intp)
+
+        # Pick between the neighbours on either side of the insertion point
+        pos = np.clip(np.searchsorted(ideal_x, xs), 1, len(ideal_x) - 1)
+        left_closer = np.abs(xs - ideal_x[pos - 1]) <= np.abs(ideal_x[pos] - xs)
+        closest = np.where(left_closer, pos - 1, pos)
+        return closest if order is None else order[closest]
+
     def _find_closest_x(self, ideal_func: IdealFunction, x_target: float) -> Optional[int]:
         """
         Find the index of the point in ideal function with closest X value.
@@ -152,22 +289,11 @@ class TestDataMapper:
         Returns:
             Index of the closest point, or None if not found.
         """
-        if not ideal_func.y_values:
+        if len(ideal_func.y_values) == 0:
             return None
-        
-        # For simplicity, we assume ideal functions have the same X values
-        # as training data and we can interpolate
-        # In a real scenario, you might want to implement linear interpolation
-        
-        # For now, we'll find the closest X value
-        min_distance = float("inf")
-        closest_idx = 0
-        
-        # Since we don't have explicit X values stored with each Y in IdealFunction,
-        # we assume X values are indices or sequential
-        # This is a simplified approach - in practice you'd need to store X values
-        closest_idx = 0
-        return closest_idx
+
+        closest = self.find_closest_indices(ideal_func, np.array([x_target], dtype=np.float64))
+        return int(closest[0])
 
     def save_to_database(self, mapped_test_data: List[TestData]) -> None:
         """
@@ -179,24 +305,28 @@ class TestDataMapper:
         Raises:
             MappingError: If database save fails.
         """
-        session: Session = None
+        rows = [
+            {
+                "x": test_point.x,
+                "y": test_point.y,
+                "delta_y": test_point.delta_y,
+                "ideal_function_no": test_point.ideal_function_no,
+            }
+            for test_point in mapped_test_data
+        ]
+        self.save_rows(rows)
+
+    def save_rows(self, rows: List[dict]) -> None:
+        """
+        Bulk-insert already mapped test data rows into the database.
+
+        Args:
+            rows: Dictionaries with keys x, y, delta_y and ideal_function_no.
+
+        Raises:
+            MappingError: If database save fails.
+        """
         try:
-            session = self.db.get_session()
-            
-            for test_point in mapped_test_data:
-                db_record = TestDataDB(
-                    x=test_point.x,
-                    y=test_point.y,
-                    delta_y=test_point.delta_y,
-                    ideal_function_no=test_point.ideal_function_no,
-                )
-                session.add(db_record)
-            
-            session.commit()
+            self.db.bulk_insert_test(rows)
         except Exception as e:
-            if session:
-                session.rollback()
             raise MappingError(f"Error saving test data to database: {str(e)}") from e
-        finally:
-            if session:
-                session.close()
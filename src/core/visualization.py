@@ -5,20 +5,159 @@ This module creates visualizations for training data, selected ideal functions,
 and test data with their assignments.
 """
 
-from typing import List, Dict
-from bokeh.plotting import figure, output_file, save
-from bokeh.layouts import column
-from bokeh.models import HoverTool
-from src.models.models import TrainingData, IdealFunction, TestData
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, List, Optional, Tuple, Union
+from src.models.models import TrainingData, TrainingDataset, IdealFunction, TestData
 from src.utils.exceptions import VisualizationError
-import numpy as np
 import webbrowser
 import os
 import threading
-import socketserver
 import http.server
 import functools
+import hashlib
 from pathlib import Path
+from types import SimpleNamespace
+
+if TYPE_CHECKING:
+    from bokeh.models import ColumnDataSource
+
+
+@functools.lru_cache(maxsize=None)
+def _bokeh() -> SimpleNamespace:
+    """
+    Import the Bokeh names used by the Visualizer on first use.
+
+    Bokeh is slow to import, so it is only loaded once a plot is created.
+
+    Returns:
+        Namespace holding the imported Bokeh callables and resources.
+    """
+    from bokeh.embed import file_html
+    from bokeh.layouts import column
+    from bokeh.models import ColumnDataSource, HoverTool
+    from bokeh.plotting import figure
+    from bokeh.resources import CDN
+
+    return SimpleNamespace(
+        file_html=file_html,
+        column=column,
+        ColumnDataSource=ColumnDataSource,
+        HoverTool=HoverTool,
+        figure=figure,
+        CDN=CDN,
+    )
+
+
+class _FileWatcher:
+    """
+    Watches a file's modification time from a background thread.
+
+    Threads waiting in wait_for_change are woken up as soon as the file
+    changes, so clients are pushed updates instead of polling.
+    """
+
+    def __init__(self, path: Path, interval: float = 0.5) -> None:
+        """
+        Initialize the watcher.
+
+        Args:
+            path: File to watch.
+            interval: Seconds between modification time checks.
+        """
+        self.path = path
+        self.interval = interval
+        self.version = 0
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def stopped(self) -> bool:
+        """Whether the watcher has been stopped."""
+        return self._stopped.is_set()
+
+    def start(self) -> None:
+        """Start watching in a background thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and wake up all waiting threads."""
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """
+        Block until the file changes after a given version, or the timeout expires.
+
+        Args:
+            version: The last version the caller has seen.
+            timeout: Maximum number of seconds to wait.
+
+        Returns:
+            The current version.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self.version != version or self.stopped, timeout
+            )
+            return self.version
+
+    def _mtime(self) -> Optional[int]:
+        """Return the file's modification time, or None if it does not exist."""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _run(self) -> None:
+        """Poll the modification time until stopped."""
+        last = self._mtime()
+        while not self._stopped.wait(self.interval):
+            current = self._mtime()
+            if current != last:
+                last = current
+                with self._cond:
+                    self.version += 1
+                    self._cond.notify_all()
+
+
+class _LiveReloadHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Static file handler that also serves a Server-Sent Events stream.
+
+    Clients connected to /events receive a "reload" event whenever the
+    watched file changes.
+    """
+
+    def __init__(self, *args, watcher: _FileWatcher, **kwargs) -> None:
+        # Must be set before the base class handles the request
+        self.watcher = watcher
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        """Serve /events as an event stream and everything else as files."""
+        if self.path != "/events":
+            super().do_GET()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        version = self.watcher.version
+        try:
+            while not self.watcher.stopped:
+                current = self.watcher.wait_for_change(version, timeout=15.0)
+                if current != version:
+                    version = current
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    # Comment line keeps idle connections from timing out
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
 
 
 class Visualizer:
@@ -36,10 +175,75 @@ class Visualizer:
         """
         self.output_path = output_path
         self.plots = []
+        # (id(dataset), key) -> (dataset, ColumnDataSource), shared across plots
+        self._sources: Dict[Tuple[int, Hashable], Tuple[object, "ColumnDataSource"]] = {}
+        self._httpd: Optional[http.server.ThreadingHTTPServer] = None
+        self._server_thread: Optional[threading.Thread] = None
+        self._served_file: Optional[Path] = None
+        self._watcher: Optional[_FileWatcher] = None
+        # path -> digest of the content last written there
+        self._written_digests: Dict[Path, bytes] = {}
+
+    def _get_source(
+        self,
+        dataset: object,
+        key: Hashable,
+        build: Callable[[], Dict[str, list]],
+    ) -> "ColumnDataSource":
+        """
+        Get a ColumnDataSource for a dataset, building it only once.
+
+        Reusing the same source across glyphs lets Bokeh serialize the
+        data once in the output document.
+
+        Args:
+            dataset: The dataset the source is derived from.
+            key: Distinguishes several sources derived from the same dataset.
+            build: Callable returning the column data for a new source.
+
+        Returns:
+            The cached or newly created ColumnDataSource.
+        """
+        cache_key = (id(dataset), key)
+        cached = self._sources.get(cache_key)
+        if cached is not None and cached[0] is dataset:
+            return cached[1]
+
+        source = _bokeh().ColumnDataSource(data=build())
+        self._sources[cache_key] = (dataset, source)
+        return source
+
+    def _ideal_source(
+        self,
+        ideal_func: IdealFunction,
+        x_values: Optional[List[float]] = None,
+    ) -> "ColumnDataSource":
+        """
+        Get the ColumnDataSource holding a whole ideal function curve.
+
+        Args:
+            ideal_func: The ideal function to plot.
+            x_values: Optional X values; defaults to the function's own X values,
+                or point indices if it has none.
+
+        Returns:
+            Source with columns x and y.
+        """
+        key = ("ideal", None if x_values is None else id(x_values))
+        if x_values is None:
+            x_values = ideal_func.x_values
+        if x_values is None:
+            x_values = list(range(len(ideal_func.y_values)))
+        # Arrays are passed through as-is; Bokeh encodes them in binary form
+        return self._get_source(
+            ideal_func,
+            key,
+            lambda: {"x": x_values, "y": ideal_func.y_values},
+        )
 
     def plot_training_data_with_ideal_function(
         self,
-        training_data: List[TrainingData],
+        training_data: Union[TrainingDataset, List[TrainingData]],
         ideal_function: IdealFunction,
         training_index: int,
         ideal_function_index: int,
@@ -48,7 +252,7 @@ class Visualizer:
         Create a plot of training data with its selected ideal function.
 
         Args:
-            training_data: List of training data points.
+            training_data: Training data as a TrainingDataset or a list of points.
             ideal_function: The selected ideal function to plot.
             training_index: Index of the training dataset (0-3 for Y1-Y4).
             ideal_function_index: Index of the ideal function (0-49).
@@ -57,14 +261,27 @@ class Visualizer:
             VisualizationError: If plot creation fails.
         """
         try:
-            # Extract data
-            x_train = [t.x for t in training_data]
-            y_train = [t.y_values[training_index] for t in training_data]
-            x_ideal = [ideal_function.x]
-            y_ideal = [ideal_function.y_values[ideal_function_index]]
+            def build_train_columns() -> Dict[str, list]:
+                if isinstance(training_data, TrainingDataset):
+                    return {
+                        "x": training_data.x,
+                        "y": training_data.Y[:, training_index],
+                    }
+                # Extract data in a single pass over the training points
+                x_train = []
+                y_train = []
+                for t in training_data:
+                    x_train.append(t.x)
+                    y_train.append(t.y_values[training_index])
+                return {"x": x_train, "y": y_train}
+
+            train_source = self._get_source(
+                training_data, ("train", training_index), build_train_columns
+            )
+            ideal_source = self._ideal_source(ideal_function)
 
             # Create figure
-            p = figure(
+            p = _bokeh().figure(
                 title=f"Training Data Y{training_index + 1} vs Ideal Function {ideal_function_index + 1}",
                 x_axis_label="X",
                 y_axis_label="Y",
@@ -75,8 +292,9 @@ class Visualizer:
 
             # Plot training data
             p.scatter(
-                x_train,
-                y_train,
+                "x",
+                "y",
+                source=train_source,
                 size=8,
                 color="blue",
                 alpha=0.6,
@@ -85,15 +303,16 @@ class Visualizer:
 
             # Plot ideal function
             p.line(
-                x_ideal,
-                y_ideal,
+                "x",
+                "y",
+                source=ideal_source,
                 line_width=2,
                 color="red",
                 legend_label=f"Ideal Function {ideal_function_index + 1}",
             )
 
             # Add hover tool
-            hover = HoverTool(tooltips=[("X", "@x"), ("Y", "@y")])
+            hover = _bokeh().HoverTool(tooltips=[("X", "@x"), ("Y", "@y")])
             p.add_tools(hover)
 
             p.legend.click_policy = "hide"
@@ -120,12 +339,14 @@ class Visualizer:
             VisualizationError: If plot creation fails.
         """
         try:
-            # Extract test data
-            x_test = [t.x for t in test_data]
-            y_test = [t.y for t in test_data]
+            test_source = self._get_source(
+                test_data,
+                "test",
+                lambda: {"x": [t.x for t in test_data], "y": [t.y for t in test_data]},
+            )
 
             # Create figure
-            p = figure(
+            p = _bokeh().figure(
                 title="Test Data Assignments",
                 x_axis_label="X",
                 y_axis_label="Y",
@@ -136,8 +357,9 @@ class Visualizer:
 
             # Plot test data points
             p.scatter(
-                x_test,
-                y_test,
+                "x",
+                "y",
+                source=test_source,
                 size=8,
                 color="green",
                 alpha=0.6,
@@ -149,19 +371,18 @@ class Visualizer:
             for i, (key, value) in enumerate(selected_indices.items()):
                 ideal_idx = value.get("index")
                 if ideal_idx is not None:
-                    ideal_func = ideal_functions[ideal_idx]
-                    x_ideal = [ideal_func.x]
-                    y_ideal = [ideal_func.y_values[ideal_idx]]
+                    ideal_source = self._ideal_source(ideal_functions[ideal_idx])
 
                     p.line(
-                        x_ideal,
-                        y_ideal,
+                        "x",
+                        "y",
+                        source=ideal_source,
                         line_width=2,
                         color=colors[i],
                         legend_label=f"Ideal {key} (Function {ideal_idx + 1})",
                     )
 
-            hover = HoverTool(tooltips=[("X", "@x"), ("Y", "@y")])
+            hover = _bokeh().HoverTool(tooltips=[("X", "@x"), ("Y", "@y")])
             p.add_tools(hover)
             p.legend.click_policy = "hide"
             self.plots.append(p)
@@ -186,7 +407,7 @@ class Visualizer:
         """
         try:
             # Create figure
-            p = figure(
+            p = _bokeh().figure(
                 title="All 50 Ideal Functions",
                 x_axis_label="X",
                 y_axis_label="Y",
@@ -204,19 +425,17 @@ class Visualizer:
                 "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"
             ]
             for i, ideal_func in enumerate(ideal_functions[:20]):  # Plot first 20 for clarity
-                x_data = [ideal_func.x] if x_values is None else [x_values[0]]
-                y_data = [ideal_func.y_values[i]]
-
                 p.line(
-                    x_data,
-                    y_data,
+                    "x",
+                    "y",
+                    source=self._ideal_source(ideal_func, x_values),
                     line_width=1,
                     color=bokeh_colors[i % len(bokeh_colors)],
                     alpha=0.7,
                     legend_label=f"Function {i + 1}",
                 )
 
-            hover = HoverTool(tooltips=[("X", "@x"), ("Y", "@y")])
+            hover = _bokeh().HoverTool(tooltips=[("X", "@x"), ("Y", "@y")])
             p.add_tools(hover)
             p.legend.click_policy = "hide"
             self.plots.append(p)
@@ -237,9 +456,10 @@ class Visualizer:
 
             # Ensure we use an absolute path and a proper file URI on all OSes
             file_path = Path(self.output_path).resolve()
-            output_file(str(file_path))
-            layout = column(*self.plots)
-            save(layout)
+            # Render once to a standalone document; avoids output_file's global state
+            bokeh = _bokeh()
+            html = bokeh.file_html(bokeh.column(*self.plots), bokeh.CDN, "Visualization")
+            self._write_if_changed(file_path, html)
 
             # Create a small live wrapper that reloads when the HTML changes
             wrapper_path = file_path.parent / "visualization_live.html"
@@ -253,55 +473,23 @@ class Visualizer:
   <body>
     <iframe id=\"viz\" src=\"{file_path.name}\" style=\"width:100%;height:100vh;border:none;\"></iframe>
     <script>
-      let last = null;
-      async function check(){{
-        try{{
-          const res = await fetch('{file_path.name}', {{method:'HEAD', cache:'no-store'}});
-          const lm = res.headers.get('Last-Modified');
-          if (last && lm && lm !== last) {{
-            document.getElementById('viz').src = '{file_path.name}#' + Date.now();
-          }}
-          last = lm;
-        }}catch(e){{}}
-      }}
-      setInterval(check, 2000);
+      const events = new EventSource('/events');
+      events.onmessage = function(e){{
+        if (e.data === 'reload') {{
+          document.getElementById('viz').src = '{file_path.name}?t=' + Date.now();
+        }}
+      }};
     </script>
   </body>
 </html>"""
             try:
-                wrapper_path.write_text(wrapper_html, encoding="utf-8")
+                self._write_if_changed(wrapper_path, wrapper_html)
             except Exception:
                 pass
 
-            # Try to start a local HTTP server serving the file's directory
-            server_started = False
-            if not getattr(self, "_server_thread", None):
-                try:
-                    Handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(file_path.parent))
-                    from http.server import ThreadingHTTPServer
-
-                    server = None
-                    # scan for an available port
-                    for port_try in range(8000, 8100):
-                        try:
-                            server = ThreadingHTTPServer(("127.0.0.1", port_try), Handler)
-                            port = port_try
-                            break
-                        except OSError:
-                            server = None
-                            continue
-
-                    if server is None:
-                        raise OSError("No available port in range 8000-8099")
-
-                    thread = threading.Thread(target=server.serve_forever, daemon=True)
-                    thread.start()
-                    self._server_thread = thread
-                    self._httpd = server
-                    server_started = True
-                except Exception as ex:
-                    print(f"Could not start local HTTP server: {ex}")
-                    server_started = False
+            # Start (or reuse) a local HTTP server serving the file's directory
+            port = self._ensure_server(file_path)
+            server_started = port is not None
 
             # Prefer opening the live wrapper via HTTP so auto-reload works
             try:
@@ -315,11 +503,7 @@ class Visualizer:
                     try:
                         input("Press Enter to stop the local visualization server and exit...\n")
                     finally:
-                        try:
-                            if hasattr(self, "_httpd") and self._httpd:
-                                self._httpd.shutdown()
-                        except Exception:
-                            pass
+                        self.stop_server()
                 else:
                     # Fall back to opening the file directly
                     opened = False
@@ -344,6 +528,84 @@ class Visualizer:
         except Exception as e:
             raise VisualizationError(f"Error saving visualizations: {str(e)}") from e
 
+    def _write_if_changed(self, path: Path, content: str) -> bool:
+        """
+        Atomically write a text file, skipping the write if nothing changed.
+
+        The content is written to a temporary file that then replaces the
+        target, so the live-reload page never sees a half-written file.
+
+        Args:
+            path: Destination file.
+            content: Text to write.
+
+        Returns:
+            True if the file was written, False if it was already up to date.
+        """
+        data = content.encode("utf-8")
+        digest = hashlib.blake2b(data, digest_size=8).digest()
+        if self._written_digests.get(path) == digest and path.exists():
+            return False
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        self._written_digests[path] = digest
+        return True
+
+    def _ensure_server(self, file_path: Path) -> Optional[int]:
+        """
+        Start a local HTTP server for a file's directory, reusing a running one.
+
+        The OS picks a free port, so no port range has to be probed. The
+        server pushes a reload event to connected pages when the file changes.
+
+        Args:
+            file_path: Visualization file to serve and watch.
+
+        Returns:
+            The port the server listens on, or None if it could not be started.
+        """
+        if self._httpd is not None and self._served_file == file_path:
+            return self._httpd.server_address[1]
+        self.stop_server()
+
+        watcher = _FileWatcher(file_path)
+        try:
+            Handler = functools.partial(
+                _LiveReloadHandler, directory=str(file_path.parent), watcher=watcher
+            )
+            server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            watcher.start()
+        except Exception as ex:
+            print(f"Could not start local HTTP server: {ex}")
+            return None
+
+        self._httpd = server
+        self._server_thread = thread
+        self._served_file = file_path
+        self._watcher = watcher
+        return server.server_address[1]
+
+    def stop_server(self) -> None:
+        """Stop the local HTTP server and its file watcher if they are running."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self._httpd is None:
+            return
+        try:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+        except Exception:
+            pass
+        self._httpd = None
+        self._server_thread = None
+        self._served_file = None
+
     def clear_plots(self) -> None:
-        """Clear all stored plots."""
+        """Clear all stored plots and their shared data sources."""
         self.plots = []
+        self._sources = {}
@@ -2,14 +2,60 @@
 Database models using SQLAlchemy ORM for the IU CSEMDSPWP01 Python project.
 """
 
-from sqlalchemy import create_engine, Column, Integer, Float, ForeignKey
+from sqlalchemy import (
+    create_engine,
+    event,
+    inspect,
+    Column,
+    Integer,
+    Float,
+    ForeignKey,
+    Insert,
+    UniqueConstraint,
+)
+from sqlalchemy.engine import Connection, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Optional
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 import os
+from src.utils.exceptions import DatabaseError
 
 Base = declarative_base()
 
+# Rows per executemany call. The driver binds one row per statement, so
+# this only limits how many parameter sets are handed over at once; it is
+# unrelated to SQLite's bound-variable limit
+_CHUNK = 1000
+
+_NOT_INITIALIZED = "Database not initialized. Call init_db() first."
+
+# Index on test_data.x, created by Database.finalize_load after bulk loading
+_TEST_X_INDEX = "ix_test_x"
+
+# URL of a private in-memory SQLite database
+_MEMORY_URL = "sqlite://"
+
+# Applied to every new SQLite connection: WAL journaling with NORMAL sync
+# avoids an fsync per commit, temp tables stay in memory, 64 MiB page cache
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+)
+
+
+def _set_sqlite_pragmas(dbapi_conn, _connection_record) -> None:
+    """Apply _SQLITE_PRAGMAS to a freshly opened DB-API connection."""
+    cursor = dbapi_conn.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 
 class TrainingDataDB(Base):
     """
@@ -23,8 +69,8 @@ class TrainingDataDB(Base):
 
     __tablename__ = "training_data"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    x = Column(Float, nullable=False, unique=True)
+    id = Column(Integer, primary_key=True)
+    x = Column(Float, nullable=False)
     y1 = Column(Float, nullable=False)
     y2 = Column(Float, nullable=False)
     y3 = Column(Float, nullable=False)
@@ -43,8 +89,8 @@ class IdealFunctionDB(Base):
 
     __tablename__ = "ideal_functions"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    x = Column(Float, nullable=False, unique=True)
+    id = Column(Integer, primary_key=True)
+    x = Column(Float, nullable=False)
     y1 = Column(Float, nullable=False)
     y2 = Column(Float, nullable=False)
     y3 = Column(Float, nullable=False)
@@ -111,13 +157,53 @@ class TestDataDB(Base):
 
     __tablename__ = "test_data"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(Integer, primary_key=True)
     x = Column(Float, nullable=False)
     y = Column(Float, nullable=False)
     delta_y = Column(Float, nullable=True)
     ideal_function_no = Column(Integer, nullable=True)
 
 
+# Insert statements built once at import and reused by every bulk insert
+_TRAIN_INS = TrainingDataDB.__table__.insert()
+_IDEAL_INS = IdealFunctionDB.__table__.insert()
+_TEST_INS = TestDataDB.__table__.insert()
+
+
+def _schema_matches(conn: Connection) -> bool:
+    """
+    Check whether the existing tables match the models.
+
+    Missing tables are fine, since create_all adds them. An existing table
+    matches if it has the model's columns and unique constraints.
+
+    Args:
+        conn: Open connection to the database.
+
+    Returns:
+        False if any existing table differs from its model.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table.name)}
+        if columns != set(table.c.keys()):
+            return False
+        unique = {
+            tuple(sorted(uc["column_names"]))
+            for uc in inspector.get_unique_constraints(table.name)
+        }
+        expected_unique = {
+            tuple(sorted(c.columns.keys()))
+            for c in table.constraints
+            if isinstance(c, UniqueConstraint)
+        }
+        if unique != expected_unique:
+            return False
+    return True
+
+
 class Database:
     """
     Database manager class for SQLite database operations.
@@ -126,36 +212,112 @@ class Database:
     and provides methods for interacting with the database.
     """
 
-    def __init__(self, db_path: str = "ideal_functions.db") -> None:
+    def __init__(
+        self,
+        db_path: str = "ideal_functions.db",
+        db_url: Optional[str] = None,
+        raw_inserts: bool = False,
+    ) -> None:
         """
         Initialize the database manager.
 
         Args:
-            db_path: Path to the SQLite database file.
+            db_path: Path to the SQLite database file, or ":memory:".
+            db_url: Prebuilt SQLAlchemy URL; takes precedence over db_path.
+                SQLite is the default; for other backends, the SQLite
+                connection tuning is skipped.
+            raw_inserts: Route the bulk insert methods through raw_bulk_insert,
+                bypassing SQLAlchemy's statement execution. ORM sessions are
+                not affected.
         """
         self.db_path = db_path
+        self.raw_inserts = raw_inserts
+        if db_url is None:
+            # Resolved once here rather than on every init_db call
+            db_url = (
+                _MEMORY_URL
+                if db_path == ":memory:"
+                else "sqlite:///" + os.path.abspath(db_path)
+            )
+        self.db_url = db_url
         self.engine = None
         self.Session = None
+        self._scoped_session: Optional[scoped_session] = None
 
     def init_db(self) -> None:
         """
-        Initialize the database and create all tables.
+        Initialize the database and create any missing tables.
+
+        Existing tables and their rows are kept when their schema matches the
+        models; tables with an outdated schema are dropped and recreated.
+        Once an engine exists, further calls return without doing anything;
+        call close() first to reconnect. Call reset() to start from empty
+        tables.
 
         Raises:
             DatabaseError: If database initialization fails.
         """
+        if self.engine is not None:
+            return
         try:
-            db_url = f"sqlite:///{os.path.abspath(self.db_path)}"
-            self.engine = create_engine(db_url, echo=False)
-            # Drop all existing tables to ensure clean state
-            Base.metadata.drop_all(self.engine)
-            # Create all tables fresh
-            Base.metadata.create_all(self.engine)
+            is_sqlite = make_url(self.db_url).get_backend_name() == "sqlite"
+            if is_sqlite and self.db_url in (_MEMORY_URL, "sqlite:///:memory:"):
+                # One shared connection, otherwise every checkout sees a new empty DB
+                pool_options = {
+                    "poolclass": StaticPool,
+                    "connect_args": {"check_same_thread": False},
+                }
+            else:
+                # The dialect's default pool already reuses file connections;
+                # the connect listener below sets up each new one
+                pool_options = {}
+            # Larger compiled-statement cache than the default of 500
+            engine = create_engine(
+                self.db_url, echo=False, query_cache_size=1200, **pool_options
+            )
+            if is_sqlite:
+                event.listen(engine, "connect", _set_sqlite_pragmas)
+            try:
+                with engine.begin() as conn:
+                    if not _schema_matches(conn):
+                        # Tables from an older schema version are rebuilt
+                        Base.metadata.drop_all(conn)
+                    Base.metadata.create_all(conn, checkfirst=True)
+            except Exception:
+                engine.dispose()
+                raise
+            self.engine = engine
             self.Session = sessionmaker(bind=self.engine)
+            # Thread-local registry behind session_scope()
+            self._scoped_session = scoped_session(self.Session)
         except Exception as e:
-            from src.utils.exceptions import DatabaseError
+            raise DatabaseError(f"Failed to initialize database: {str(e)}") from e
+
+    def reset(self, vacuum: bool = False) -> None:
+        """
+        Delete all rows from all tables in a single transaction.
+
+        The test_data.x index created by finalize_load() is dropped as well,
+        so the next load inserts into an unindexed table again.
+
+        Args:
+            vacuum: Also run VACUUM afterwards to shrink the database file.
 
-            raise DatabaseError(f"Failed to initialize database: {str(e)}")
+        Raises:
+            DatabaseError: If the engine is not initialized.
+        """
+        if self.engine is None:
+            raise DatabaseError(_NOT_INITIALIZED)
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {_TEST_X_INDEX}")
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+        if vacuum:
+            # VACUUM cannot run inside a transaction
+            with self.engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            ) as conn:
+                conn.exec_driver_sql("VACUUM")
 
     def get_session(self) -> Session:
         """
@@ -168,23 +330,225 @@ class Database:
             DatabaseError: If engine is not initialized.
         """
         if self.engine is None:
-            from src.utils.exceptions import DatabaseError
-
-            raise DatabaseError("Database not initialized. Call init_db() first.")
+            raise DatabaseError(_NOT_INITIALIZED)
         return self.Session()
 
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """
+        Provide a session whose work is committed as one transaction.
+
+        Nested scopes on the same thread share the outermost scope's session,
+        so their work joins its transaction. The outermost scope commits,
+        rolls back if the block raises, and releases the session either way.
+
+        Yields:
+            SQLAlchemy Session object.
+
+        Raises:
+            DatabaseError: If engine is not initialized.
+        """
+        if self.engine is None:
+            raise DatabaseError(_NOT_INITIALIZED)
+        if self._scoped_session.registry.has():
+            yield self._scoped_session()
+            return
+
+        session = self._scoped_session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self._scoped_session.remove()
+
+    def bulk_insert_training(
+        self, rows: List[Dict[str, float]], conn: Optional[Connection] = None
+    ) -> None:
+        """
+        Bulk-insert training data rows.
+
+        Args:
+            rows: Dictionaries with keys x and y1 to y4.
+            conn: Connection with an open transaction to insert into. If omitted,
+                the rows are inserted in a transaction of their own.
+
+        Raises:
+            DatabaseError: If the engine is not initialized.
+        """
+        self._bulk_insert(_TRAIN_INS, rows, conn)
+
+    def bulk_insert_ideal(
+        self, rows: List[Dict[str, float]], conn: Optional[Connection] = None
+    ) -> None:
+        """
+        Bulk-insert ideal function rows.
+
+        Args:
+            rows: Dictionaries with keys x and y1 to y50.
+            conn: Connection with an open transaction to insert into. If omitted,
+                the rows are inserted in a transaction of their own.
+
+        Raises:
+            DatabaseError: If the engine is not initialized.
+        """
+        self._bulk_insert(_IDEAL_INS, rows, conn)
+
+    def bulk_insert_test(
+        self, rows: List[Dict[str, Optional[float]]], conn: Optional[Connection] = None
+    ) -> None:
+        """
+        Bulk-insert mapped test data rows.
+
+        Args:
+            rows: Dictionaries with keys x, y, delta_y and ideal_function_no.
+            conn: Connection with an open transaction to insert into. If omitted,
+                the rows are inserted in a transaction of their own.
+
+        Raises:
+            DatabaseError: If the engine is not initialized.
+        """
+        self._bulk_insert(_TEST_INS, rows, conn)
+
+    def _bulk_insert(
+        self, stmt: Insert, rows: List[dict], conn: Optional[Connection]
+    ) -> None:
+        """
+        Insert rows with Core executemany in chunks of _CHUNK rows.
+
+        Args:
+            stmt: Prebuilt insert statement of the target table.
+            rows: Row dictionaries keyed by column name.
+            conn: Connection with an open transaction, or None to use a new one.
+
+        Raises:
+            DatabaseError: If the engine is not initialized.
+        """
+        if not rows:
+            return
+        if conn is None:
+            if self.engine is None:
+                raise DatabaseError(_NOT_INITIALIZED)
+            # All chunks share one transaction and one commit
+            with self.engine.begin() as conn:
+                self._bulk_insert(stmt, rows, conn)
+            return
+
+        if self.raw_inserts and conn.dialect.name == "sqlite":
+            columns = list(rows[0])
+            self.raw_bulk_insert(
+                stmt.table.name,
+                columns,
+                [tuple(row[c] for c in columns) for row in rows],
+                conn,
+            )
+            return
+
+        for start in range(0, len(rows), _CHUNK):
+            conn.execute(stmt, rows[start:start + _CHUNK])
+
+    def raw_bulk_insert(
+        self,
+        table_name: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        conn: Optional[Connection] = None,
+    ) -> None:
+        """
+        Insert rows with the sqlite3 driver's executemany directly.
+
+        Skips SQLAlchemy's statement execution entirely, so each row costs
+        little more than the driver's own bind and step. On other backends
+        the rows are inserted with a Core executemany instead.
+
+        Args:
+            table_name: Name of a table defined by the models in this module.
+            columns: Column names, in the order of the values in each row.
+            rows: Value tuples, one per row.
+            conn: Connection with an open transaction to insert into. If omitted,
+                the rows are inserted and committed on a pooled raw connection.
+
+        Raises:
+            DatabaseError: If the engine is not initialized or the table or
+                columns are unknown.
+        """
+        table = Base.metadata.tables.get(table_name)
+        if table is None:
+            raise DatabaseError(f"Unknown table: {table_name}")
+        unknown = set(columns) - set(table.c.keys())
+        if unknown:
+            raise DatabaseError(f"Unknown columns for {table_name}: {unknown}")
+        if self.engine is None and conn is None:
+            raise DatabaseError(_NOT_INITIALIZED)
+        dialect = (conn or self.engine).dialect
+        if dialect.name != "sqlite":
+            # "?" placeholders and the sqlite3 cursor API are SQLite-specific
+            self._bulk_insert(
+                table.insert(), [dict(zip(columns, row)) for row in rows], conn
+            )
+            return
+
+        # Names are checked against the model metadata above
+        sql = (
+            f"INSERT INTO {table_name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})"
+        )
+
+        if conn is not None:
+            # Same DB-API connection, so the rows join the caller's transaction
+            cursor = conn.connection.cursor()
+            try:
+                cursor.executemany(sql, rows)
+            finally:
+                cursor.close()
+            return
+
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            try:
+                cursor.executemany(sql, rows)
+            finally:
+                cursor.close()
+            raw.commit()
+        except Exception:
+            raw.rollback()
+            raise
+        finally:
+            raw.close()
+
+    def finalize_load(self) -> None:
+        """
+        Create the lookup index on test_data.x once all rows are loaded.
+
+        Building the index after the bulk load is a single sort instead of
+        one B-tree update per inserted row.
+
+        Raises:
+            DatabaseError: If the engine is not initialized.
+        """
+        if self.engine is None:
+            raise DatabaseError(_NOT_INITIALIZED)
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(
+                f"CREATE INDEX IF NOT EXISTS {_TEST_X_INDEX} ON test_data (x)"
+            )
+
     def close(self) -> None:
         """Close the database connection."""
+        if self._scoped_session is not None:
+            self._scoped_session.remove()
+            self._scoped_session = None
         if self.engine:
             self.engine.dispose()
+            self.engine = None
+            self.Session = None
 
     def clear_all_tables(self) -> None:
         """Clear all data from all tables."""
-        session = self.get_session()
-        try:
+        with self.session_scope() as session:
             session.query(TestDataDB).delete()
             session.query(IdealFunctionDB).delete()
             session.query(TrainingDataDB).delete()
-            session.commit()
-        finally:
-            session.close()
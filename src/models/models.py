@@ -2,15 +2,24 @@
 Data models for the IU CSEMDSPWP01 Python project.
 """
 
-from typing import List
+import sys
+import numpy as np
+from typing import List, Optional, Sequence, Union
 from dataclasses import dataclass
 
+# dataclass(slots=True) needs Python 3.10+; older versions fall back to __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(frozen=True, **_SLOTS)
 class TrainingData:
     """
     Represents a single row of training data.
 
+    Instances are immutable. Bulk loads go through TrainingDataset, which
+    validates the whole file at once; only rows built one by one pay the
+    per-row check below.
+
     Attributes:
         x: The input value.
         y_values: List of four Y values (Y1, Y2, Y3, Y4).
@@ -25,7 +34,81 @@ class TrainingData:
             raise ValueError("Training data must have exactly 4 Y values")
 
 
-@dataclass
+# eq=False: comparing ndarray fields element-wise has no single truth value
+@dataclass(eq=False, **_SLOTS)
+class TrainingDataset:
+    """
+    Training data stored column-wise as NumPy arrays.
+
+    Attributes:
+        x: Input values, shape (N,).
+        Y: Output values of the four training datasets, shape (N, 4).
+    """
+
+    x: np.ndarray
+    Y: np.ndarray
+
+    def __post_init__(self) -> None:
+        """Validate the array shapes once for the whole dataset."""
+        if self.Y.ndim != 2 or self.Y.shape[1] != 4:
+            raise ValueError("Training data must have exactly 4 Y values")
+        if self.x.shape != (self.Y.shape[0],):
+            raise ValueError("Training data must have one X value per row of Y values")
+
+    def __len__(self) -> int:
+        """Return the number of training points."""
+        return len(self.x)
+
+    @property
+    def rows(self) -> List[TrainingData]:
+        """Build one TrainingData object per point, for row-based callers."""
+        return [
+            TrainingData(x=x, y_values=y_row)
+            for x, y_row in zip(self.x.tolist(), self.Y.tolist())
+        ]
+
+
+# eq=False: comparing ndarray fields element-wise has no single truth value
+@dataclass(eq=False, **_SLOTS)
+class IdealDataset:
+    """
+    Ideal functions stored column-wise as NumPy arrays.
+
+    Attributes:
+        x: Sorted input values, shape (N,).
+        Y: Output values of the 50 ideal functions, shape (N, 50).
+    """
+
+    x: np.ndarray
+    Y: np.ndarray
+
+    def __post_init__(self) -> None:
+        """Validate the array shapes once for the whole dataset."""
+        if self.Y.ndim != 2 or self.Y.shape[0] != len(self.x):
+            raise ValueError("Ideal functions must have one row of Y values per X value")
+        if self.Y.shape[1] == 0:
+            raise ValueError("Ideal function must have Y values")
+
+    def __len__(self) -> int:
+        """Return the number of X values."""
+        return len(self.x)
+
+    @property
+    def functions(self) -> List["IdealFunction"]:
+        """
+        Build one IdealFunction per column of Y.
+
+        Each function's y_values is a view onto Y, so no values are copied
+        when Y is the transpose of a row-major (50, N) matrix.
+        """
+        x_ref = float(self.x[0]) if len(self.x) else 0.0
+        return [
+            IdealFunction(x=x_ref, y_values=y_col, x_values=self.x)
+            for y_col in self.Y.T
+        ]
+
+
+@dataclass(**_SLOTS)
 class IdealFunction:
     """
     Represents ideal function data.
@@ -35,19 +118,24 @@ class IdealFunction:
 
     Attributes:
         x: A reference X value (not used for comparison, included for consistency).
-        y_values: List of Y values for this ideal function across all training points (400 values).
+        y_values: Y values for this ideal function across all training points (400 values).
+            Lists are converted once to a float64 NumPy array on construction.
+        x_values: Sorted X coordinates matching y_values, or None if unknown.
     """
 
     x: float
-    y_values: List[float]
+    y_values: np.ndarray
+    x_values: Optional[np.ndarray] = None
 
     def __post_init__(self) -> None:
-        """Validate that Y values are provided."""
-        if not self.y_values or len(self.y_values) == 0:
+        """Validate that Y values are provided and store them as a float64 array."""
+        if self.y_values is None or len(self.y_values) == 0:
             raise ValueError("Ideal function must have Y values")
+        # No copy when the loader already passed a float64 array
+        self.y_values = np.asarray(self.y_values, dtype=np.float64)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class TestData:
     """
     Represents a single row of test data.
@@ -63,3 +151,32 @@ class TestData:
     y: float
     delta_y: float = None
     ideal_function_no: int = None
+
+    @classmethod
+    def from_arrays(
+        cls,
+        xs: Union[np.ndarray, Sequence[float]],
+        ys: Union[np.ndarray, Sequence[float]],
+        deltas: Union[np.ndarray, Sequence[Optional[float]]],
+        function_nos: Union[np.ndarray, Sequence[Optional[int]]],
+    ) -> List["TestData"]:
+        """
+        Build TestData objects from column arrays.
+
+        NumPy arrays are converted with a single tolist() call per column
+        rather than element by element.
+
+        Args:
+            xs: Input values.
+            ys: Output values.
+            deltas: Deviations, or None for unassigned points.
+            function_nos: Assigned ideal function numbers, or None.
+
+        Returns:
+            List of TestData objects, one per row.
+        """
+        columns = [
+            col.tolist() if isinstance(col, np.ndarray) else col
+            for col in (xs, ys, deltas, function_nos)
+        ]
+        return [cls(x, y, d, f) for x, y, d, f in zip(*columns)]
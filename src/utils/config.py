@@ -4,28 +4,75 @@ Configuration module for the IU CSEMDSPWP01 Python project.
 This module contains configuration settings for the application.
 """
 
+import math
 import os
-from typing import List
+from functools import lru_cache
+from typing import Callable, Dict, List
 
-# Project paths - point to the actual project root (3 levels up from this file)
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-DATA_DIR = os.path.join(PROJECT_ROOT, "Data")
-OUTPUT_DIR = os.path.join(PROJECT_ROOT, "output")
+import numpy as np
 
-# Database configuration
-DATABASE_PATH = os.path.join(PROJECT_ROOT, "ideal_functions.db")
-DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
-# Data files configuration - using actual data files
-TRAINING_FILE: str = os.path.join(DATA_DIR, "train.csv")
-IDEAL_FUNCTIONS_FILE: str = os.path.join(DATA_DIR, "ideal.csv")
-TEST_DATA_FILE: str = os.path.join(DATA_DIR, "test.csv")
-# Output files configuration
-VISUALIZATION_OUTPUT: str = os.path.join(OUTPUT_DIR, "visualization.html")
-RESULTS_OUTPUT: str = os.path.join(OUTPUT_DIR, "results.json")
+@lru_cache(maxsize=1)
+def project_root() -> str:
+    """Return the project root (3 levels up from this file)."""
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@lru_cache(maxsize=1)
+def data_dir() -> str:
+    """Return the directory holding the input CSV files."""
+    return os.path.join(project_root(), "Data")
+
+
+@lru_cache(maxsize=1)
+def output_dir() -> str:
+    """Return the directory generated files are written to."""
+    return os.path.join(project_root(), "output")
+
+
+# Path settings, resolved on first attribute access (see __getattr__) so
+# importing this module does no path work. Each value is computed once.
+_LAZY_PATHS: Dict[str, Callable[[], str]] = {
+    # Project paths
+    "PROJECT_ROOT": project_root,
+    "DATA_DIR": data_dir,
+    "OUTPUT_DIR": output_dir,
+    # Database configuration
+    "DATABASE_PATH": lambda: os.path.join(project_root(), "ideal_functions.db"),
+    # Pass to Database(db_url=...) to skip resolving the path again
+    "DATABASE_URL": lambda: "sqlite:///" + os.path.abspath(
+        os.path.join(project_root(), "ideal_functions.db")
+    ),
+    # Data files configuration - using actual data files
+    "TRAINING_FILE": lambda: os.path.join(data_dir(), "train.csv"),
+    "IDEAL_FUNCTIONS_FILE": lambda: os.path.join(data_dir(), "ideal.csv"),
+    "TEST_DATA_FILE": lambda: os.path.join(data_dir(), "test.csv"),
+    # Output files configuration
+    "VISUALIZATION_OUTPUT": lambda: os.path.join(output_dir(), "visualization.html"),
+    "RESULTS_OUTPUT": lambda: os.path.join(output_dir(), "results.json"),
+}
+
+
+def __getattr__(name: str) -> str:
+    """Resolve a path setting on first access and store it as a module attribute."""
+    try:
+        factory = _LAZY_PATHS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = globals()[name] = factory()
+    return value
+
+
+def __dir__() -> List[str]:
+    """Include the lazily resolved path settings."""
+    return sorted(set(globals()) | set(_LAZY_PATHS))
+
 
 # Algorithm configuration
-SQRT_2_CONSTANT = 1.4142135623730951  # sqrt(2) for deviation threshold
+# sqrt(2) for the deviation threshold, as a NumPy scalar so array
+# arithmetic does not have to convert it on every use
+SQRT_2_CONSTANT = np.float64(math.sqrt(2.0))
+SQRT_2 = SQRT_2_CONSTANT
 TRAINING_DATASET_COUNT = 4
 IDEAL_FUNCTION_COUNT = 50
 
@@ -40,10 +87,11 @@ LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
 
 def create_directories() -> None:
-    """Create required directories if they don't exist."""
-    for directory in [DATA_DIR, OUTPUT_DIR]:
-        os.makedirs(directory, exist_ok=True)
-
+    """
+    Create required directories if they don't exist.
 
-# Create directories on import
-create_directories()
+    Called by the application entry point; importing this module has no
+    filesystem side effects.
+    """
+    for directory in [data_dir(), output_dir()]:
+        os.makedirs(directory, exist_ok=True)
@@ -6,14 +6,20 @@ Tests for data loading, ideal function selection, and database operations.
 
 import pytest
 import os
+import sqlite3
 import tempfile
 from typing import List
 
+import numpy as np
+from sqlalchemy import inspect
+
 from models import TrainingData, IdealFunction, TestData
 from data_loader import TrainingDataLoader, IdealFunctionLoader, TestDataLoader
 from ideal_function_selector import IdealFunctionSelector
+from test_mapper import TestDataMapper
 from database import Database, TrainingDataDB, IdealFunctionDB
 from exceptions import DataLoadError, InvalidDataError, DatabaseError
+import config
 
 
 class TestTrainingData:
@@ -104,6 +110,106 @@ class TestTrainingDataLoader:
         finally:
             os.unlink(temp_file)
 
+    def test_load_csv_returns_writable_copy(self):
+        """Test that loaded DataFrames can be modified without affecting the cache."""
+        loader = TrainingDataLoader()
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            f.write("x,y\n")
+            f.write("1.0,2.0\n")
+            temp_file = f.name
+
+        try:
+            df = loader.load_csv(temp_file)
+            df.loc[0, "y"] = 5.0
+            assert loader.load_csv(temp_file).loc[0, "y"] == 2.0
+        finally:
+            os.unlink(temp_file)
+
+    def test_load_csv_cache_invalidated_on_change(self):
+        """Test that a changed file is parsed again."""
+        loader = TrainingDataLoader()
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            f.write("x,y\n")
+            f.write("1.0,2.0\n")
+            temp_file = f.name
+
+        try:
+            assert loader.load_csv(temp_file).loc[0, "y"] == 2.0
+
+            # Different size
+            with open(temp_file, "w") as f:
+                f.write("x,y\n")
+                f.write("1.0,20.0\n")
+            assert loader.load_csv(temp_file).loc[0, "y"] == 20.0
+
+            # Same size, newer modification time
+            with open(temp_file, "w") as f:
+                f.write("x,y\n")
+                f.write("1.0,30.0\n")
+            st = os.stat(temp_file)
+            os.utime(temp_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            assert loader.load_csv(temp_file).loc[0, "y"] == 30.0
+        finally:
+            os.unlink(temp_file)
+
+    def test_load_test_data_invalid_value(self):
+        """Test that non-numeric values raise InvalidDataError."""
+        loader = TestDataLoader()
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            f.write("x,y\n")
+            f.write("1.0,abc\n")
+            temp_file = f.name
+
+        try:
+            # The loader raises the src.utils.exceptions class, so match it by name
+            with pytest.raises(Exception, match="Error processing test data") as exc_info:
+                loader.load_test_data(temp_file)
+            assert type(exc_info.value).__name__ == "InvalidDataError"
+        finally:
+            os.unlink(temp_file)
+
+    def test_iter_test_data_chunks(self):
+        """Test that streamed test data arrives in float64 chunks of the requested size."""
+        loader = TestDataLoader()
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            f.write("x,y\n")
+            f.write("1.0,2.0\n")
+            f.write("2.0,3.0\n")
+            f.write("3.0,4.0\n")
+            temp_file = f.name
+
+        try:
+            chunks = list(loader.iter_test_data(temp_file, chunksize=2))
+            assert [len(xs) for xs, _ in chunks] == [2, 1]
+            assert chunks[0][0].dtype == np.float64
+            assert chunks[1][0][0] == 3.0 and chunks[1][1][0] == 4.0
+        finally:
+            os.unlink(temp_file)
+
+    def test_validate_test_file_errors(self):
+        """Test that validate_test_file rejects missing files and missing columns."""
+        loader = TestDataLoader()
+
+        with pytest.raises(Exception, match="File not found") as exc_info:
+            loader.validate_test_file("nonexistent_file.csv")
+        assert type(exc_info.value).__name__ == "DataLoadError"
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            f.write("x,z\n")
+            f.write("1.0,2.0\n")
+            temp_file = f.name
+
+        try:
+            with pytest.raises(Exception, match="Missing columns") as exc_info:
+                loader.validate_test_file(temp_file)
+            assert type(exc_info.value).__name__ == "InvalidDataError"
+        finally:
+            os.unlink(temp_file)
+
 
 class TestIdealFunctionLoader:
     """Test suite for IdealFunctionLoader."""
@@ -130,6 +236,50 @@ class TestIdealFunctionLoader:
         finally:
             os.unlink(temp_file)
 
+    def test_npy_cache_reused_and_refreshed(self):
+        """Test that the .npy cache is used while fresh and rebuilt when stale or malformed."""
+        loader = IdealFunctionLoader(use_cache=True)
+
+        def write_csv(path, scale):
+            with open(path, "w") as f:
+                f.write(",".join(["x"] + [f"y{i}" for i in range(1, 51)]) + "\n")
+                for x in (1.0, 2.0):
+                    f.write(",".join([str(x)] + [str(scale * i * x) for i in range(1, 51)]) + "\n")
+
+        def touch_after(path, other, seconds):
+            mtime_ns = os.stat(other).st_mtime_ns + seconds * 1_000_000_000
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, "ideal.csv")
+            cache_path = os.path.join(temp_dir, "ideal.npy")
+            write_csv(csv_path, 1.0)
+
+            dataset = loader.load_ideal_dataset(csv_path)
+            assert os.path.exists(cache_path)
+            assert dataset.Y[1, 0] == 2.0
+
+            # A fresh cache is read instead of the CSV
+            cached = np.load(cache_path)
+            cached[1, 1] = 99.0
+            np.save(cache_path, cached)
+            touch_after(cache_path, csv_path, 10)
+            assert loader.load_ideal_dataset(csv_path).Y[1, 0] == 99.0
+            _, df = loader.load_ideal_functions(csv_path)
+            assert list(df.columns) == ["x"] + [f"y{i}" for i in range(1, 51)]
+            assert df.loc[1, "y1"] == 99.0
+
+            # A CSV newer than the cache is parsed again
+            write_csv(csv_path, 10.0)
+            touch_after(csv_path, cache_path, 10)
+            assert loader.load_ideal_dataset(csv_path).Y[1, 0] == 20.0
+
+            # A cache with the wrong shape falls back to the CSV and is rewritten
+            np.save(cache_path, np.zeros((3, 3)))
+            touch_after(cache_path, csv_path, 10)
+            assert loader.load_ideal_dataset(csv_path).Y[1, 0] == 20.0
+            assert np.load(cache_path).shape == (51, 2)
+
 
 class TestIdealFunctionSelector:
     """Test suite for IdealFunctionSelector."""
@@ -155,6 +305,16 @@ class TestIdealFunctionSelector:
         with pytest.raises(ValueError, match="same length"):
             selector.sum_squared_deviations([1.0, 2.0], [1.0, 2.0, 3.0])
 
+    def test_ssd_all(self):
+        """Test sum of squared deviations against all ideal functions at once."""
+        selector = IdealFunctionSelector()
+        training_y = np.array([1.0, 2.0, 3.0])
+        ideal_y = np.array([[1.0, 2.0], [2.0, 2.0], [3.0, 2.0]])
+        ssds = selector.ssd_all(training_y, ideal_y)
+        assert ssds.shape == (2,)
+        assert ssds[0] == 0.0
+        assert ssds[1] == 2.0  # (1-2)^2 + 0 + (3-2)^2
+
     def test_select_ideal_function_simple(self):
         """Test ideal function selection with simple data."""
         selector = IdealFunctionSelector()
@@ -180,6 +340,97 @@ class TestIdealFunctionSelector:
         assert all(d == 0.0 for d in deviations)
 
 
+    def test_selection_follows_list_mutation(self):
+        """Test that changes to the ideal function list between calls are picked up."""
+        selector = IdealFunctionSelector()
+        training_data = [
+            TrainingData(x=0.0, y_values=[1.0, 1.0, 1.0, 1.0]),
+            TrainingData(x=1.0, y_values=[1.0, 1.0, 1.0, 1.0]),
+        ]
+        funcs = [IdealFunction(x=0.0, y_values=[5.0, 5.0])]
+
+        assert selector.select_ideal_function(training_data, funcs, 0)[0] == 0
+
+        funcs.append(IdealFunction(x=0.0, y_values=[1.0, 1.0]))
+        ideal_idx, min_dev, _ = selector.select_ideal_function(training_data, funcs, 0)
+        assert ideal_idx == 1
+        assert min_dev == 0.0
+
+        funcs[0] = IdealFunction(x=0.0, y_values=[1.0, 1.0])
+        result = selector.select_all_ideal_functions(training_data, funcs)
+        assert result["y1"]["index"] == 0
+        assert result["y1"]["min_deviation"] == 0.0
+        assert result["y1"]["deviations"] == [0.0, 0.0]
+
+
+class TestTestDataMapper:
+    """Test suite for TestDataMapper."""
+
+    def test_find_closest_indices_sorted(self):
+        """Test nearest-X lookup on sorted X values, ties going to the left point."""
+        mapper = TestDataMapper(None)
+        ideal = IdealFunction(
+            x=0.0, y_values=[0.0, 1.0, 2.0, 3.0], x_values=np.array([0.0, 1.0, 2.0, 3.0])
+        )
+        closest = mapper.find_closest_indices(ideal, np.array([0.4, 0.6, 2.5, -1.0, 10.0]))
+        assert closest.tolist() == [0, 1, 2, 0, 3]
+
+    def test_find_closest_indices_unsorted(self):
+        """Test that indices refer to the original order when X is unsorted."""
+        mapper = TestDataMapper(None)
+        ideal = IdealFunction(
+            x=3.0, y_values=[30.0, 0.0, 20.0, 10.0], x_values=np.array([3.0, 0.0, 2.0, 1.0])
+        )
+        closest = mapper.find_closest_indices(ideal, np.array([0.1, 2.9, 1.6]))
+        assert closest.tolist() == [1, 0, 2]
+
+    def test_find_closest_indices_single_point(self):
+        """Test nearest-X lookup on a one-point grid."""
+        mapper = TestDataMapper(None)
+        ideal = IdealFunction(x=1.0, y_values=[5.0], x_values=np.array([1.0]))
+        closest = mapper.find_closest_indices(ideal, np.array([-3.0, 1.0, 7.0]))
+        assert closest.tolist() == [0, 0, 0]
+
+    def test_map_points_threshold(self):
+        """Test the batch threshold check used for streamed test data."""
+        mapper = TestDataMapper(None)
+        ideal = IdealFunction(
+            x=0.0, y_values=[0.0, 1.0, 2.0], x_values=np.array([0.0, 1.0, 2.0])
+        )
+        deviations, matched = mapper.map_points(
+            np.array([0.0, 1.1, 2.0]), np.array([1.0, 1.0, 4.0]), ideal, 1.0
+        )
+        assert deviations.tolist() == [1.0, 0.0, 2.0]
+        assert matched.tolist() == [True, True, False]  # Threshold is sqrt(2)
+
+    def test_map_all_test_data_best_match_and_no_match(self):
+        """Test best-match selection, tie-breaking and unmatched rows."""
+        mapper = TestDataMapper(None)
+        x_values = np.array([0.0, 1.0, 2.0])
+        ideal_functions = [
+            IdealFunction(x=0.0, y_values=[0.0, 0.0, 0.0], x_values=x_values),
+            IdealFunction(x=0.0, y_values=[1.0, 1.0, 1.0], x_values=x_values),
+        ]
+        selected = {
+            "y1": {"index": 0, "max_deviation": 1.0},
+            "y2": {"index": 1, "max_deviation": 1.0},
+        }
+        test_data = [
+            TestData(x=0.0, y=0.5),  # Equally close to both: first function wins
+            TestData(x=1.0, y=0.9),  # Closer to the second function
+            TestData(x=2.0, y=5.0),  # Outside both thresholds
+        ]
+
+        mapped = mapper.map_all_test_data(test_data, ideal_functions, [], selected)
+
+        assert [t.ideal_function_no for t in mapped] == [1, 2, None]
+        assert mapped[0].delta_y == pytest.approx(0.5)
+        assert mapped[1].delta_y == pytest.approx(0.1)
+        assert mapped[2].delta_y is None
+        # Inputs are left untouched
+        assert all(t.ideal_function_no is None and t.delta_y is None for t in test_data)
+
+
 class TestDatabase:
     """Test suite for Database class."""
 
@@ -209,12 +460,136 @@ class TestDatabase:
             
             db.close()
 
+    def test_init_db_reuses_engine_until_closed(self):
+        """Test that repeated init_db() calls keep the engine until close()."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = Database(os.path.join(temp_dir, "test.db"))
+            db.init_db()
+            engine = db.engine
+            db.init_db()
+            assert db.engine is engine
+
+            db.close()
+            assert db.engine is None
+            db.init_db()
+            assert db.engine is not None and db.engine is not engine
+            db.close()
+
     def test_database_session_without_init(self):
         """Test error when getting session without initialization."""
         db = Database(":memory:")
         with pytest.raises(DatabaseError, match="not initialized"):
             db.get_session()
 
+    def test_reset_clears_rows_and_test_index(self):
+        """Test that reset() empties all tables and drops the test_data.x index."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = Database(os.path.join(temp_dir, "test.db"))
+            db.init_db()
+            try:
+                db.bulk_insert_training([{"x": 1.0, "y1": 1.1, "y2": 2.1, "y3": 3.1, "y4": 4.1}])
+                db.bulk_insert_test([{"x": 1.0, "y": 2.0, "delta_y": None, "ideal_function_no": None}])
+                db.finalize_load()
+                assert "ix_test_x" in {i["name"] for i in inspect(db.engine).get_indexes("test_data")}
+
+                db.reset()
+
+                session = db.get_session()
+                try:
+                    assert session.query(TrainingDataDB).count() == 0
+                finally:
+                    session.close()
+                assert "ix_test_x" not in {i["name"] for i in inspect(db.engine).get_indexes("test_data")}
+            finally:
+                db.close()
+
+    def test_init_db_rebuilds_outdated_schema(self):
+        """Test that init_db() recreates tables whose schema differs from the models."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+            conn = sqlite3.connect(db_path)
+            conn.execute(
+                "CREATE TABLE training_data (id INTEGER PRIMARY KEY, x FLOAT NOT NULL UNIQUE, "
+                "y1 FLOAT NOT NULL, y2 FLOAT NOT NULL, y3 FLOAT NOT NULL, y4 FLOAT NOT NULL)"
+            )
+            conn.commit()
+            conn.close()
+
+            db = Database(db_path)
+            db.init_db()
+            try:
+                assert inspect(db.engine).get_unique_constraints("training_data") == []
+            finally:
+                db.close()
+
+    def test_session_scope_commit_rollback_and_nesting(self):
+        """Test that session_scope commits, rolls back on errors and shares nested sessions."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = Database(os.path.join(temp_dir, "test.db"))
+            db.init_db()
+            try:
+                with db.session_scope() as session:
+                    session.add(TrainingDataDB(x=1.0, y1=1.1, y2=2.1, y3=3.1, y4=4.1))
+
+                with pytest.raises(RuntimeError):
+                    with db.session_scope() as session:
+                        session.add(TrainingDataDB(x=2.0, y1=1.1, y2=2.1, y3=3.1, y4=4.1))
+                        raise RuntimeError("abort")
+
+                # An error in a nested scope rolls back the outer scope's work too
+                with pytest.raises(RuntimeError):
+                    with db.session_scope() as outer:
+                        outer.add(TrainingDataDB(x=3.0, y1=1.1, y2=2.1, y3=3.1, y4=4.1))
+                        with db.session_scope() as inner:
+                            assert inner is outer
+                            raise RuntimeError("abort")
+
+                with db.session_scope() as session:
+                    assert session is not outer
+                    assert [r.x for r in session.query(TrainingDataDB).all()] == [1.0]
+            finally:
+                db.close()
+
+    def test_raw_bulk_insert(self):
+        """Test raw sqlite3 inserts, with and without a caller's transaction."""
+        row = {"x": 1.0, "y1": 1.1, "y2": 2.1, "y3": 3.1, "y4": 4.1}
+        columns = list(row)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = Database(os.path.join(temp_dir, "test.db"), raw_inserts=True)
+            db.init_db()
+
+            def count():
+                session = db.get_session()
+                try:
+                    return session.query(TrainingDataDB).count()
+                finally:
+                    session.close()
+
+            try:
+                db.bulk_insert_training([row, dict(row, x=2.0)])
+                assert count() == 2
+
+                # Rows inserted on the caller's connection roll back with it
+                with pytest.raises(RuntimeError):
+                    with db.engine.begin() as conn:
+                        db.raw_bulk_insert("training_data", columns, [tuple(row.values())], conn)
+                        raise RuntimeError("abort")
+                assert count() == 2
+
+                with db.engine.begin() as conn:
+                    db.raw_bulk_insert("training_data", columns, [tuple(row.values())], conn)
+                assert count() == 3
+
+                with pytest.raises(Exception, match="Unknown table") as exc_info:
+                    db.raw_bulk_insert("missing", columns, [])
+                assert type(exc_info.value).__name__ == "DatabaseError"
+                with pytest.raises(Exception, match="Unknown columns") as exc_info:
+                    db.raw_bulk_insert("training_data", ["x", "y9"], [])
+                assert type(exc_info.value).__name__ == "DatabaseError"
+            finally:
+                db.close()
+
     def test_database_insert_and_retrieve(self):
         """Test inserting and retrieving data from database."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -238,6 +613,25 @@ class TestDatabase:
                 db.close()
 
 
+class TestConfig:
+    """Test suite for the lazily resolved config paths."""
+
+    def test_path_resolved_on_first_access(self):
+        """Test that a path setting is computed on first access and then stored."""
+        vars(config).pop("RESULTS_OUTPUT", None)
+        assert "RESULTS_OUTPUT" not in vars(config)
+        assert "RESULTS_OUTPUT" in dir(config)
+
+        expected = os.path.join(config.output_dir(), "results.json")
+        assert config.RESULTS_OUTPUT == expected
+        assert vars(config)["RESULTS_OUTPUT"] == expected
+
+    def test_unknown_attribute(self):
+        """Test that unknown names still raise AttributeError."""
+        with pytest.raises(AttributeError, match="NOT_A_SETTING"):
+            config.NOT_A_SETTING
+
+
 class TestExceptions:
     """Test suite for custom exceptions."""
 